@@ -5,8 +5,18 @@ A2A-Aptos Bidding System - 通用模块
 
 import yaml
 import os
-from aptos_sdk.async_client import RestClient
+import json
+import time
+import asyncio
+import functools
+from collections import OrderedDict
+from typing import Optional, Tuple
+import httpx
+from dotenv import load_dotenv
+from aptos_sdk.async_client import RestClient, ApiError
 from aptos_sdk.account import Account
+from aptos_sdk.bcs import Serializer
+from aptos_sdk.transactions import EntryFunction, TransactionPayload
 
 # --- 配置 ---
 
@@ -20,6 +30,26 @@ DEFAULT_PROFILE = "task_manager_dev"
 # bidding_system 模块名称
 BIDDING_MODULE = "bidding_system"
 
+# 等待交易确认时的轮询间隔（秒）：从较短间隔开始，按倍数退避到上限
+TRANSACTION_POLL_INITIAL = 0.2
+TRANSACTION_POLL_FACTOR = 1.5
+TRANSACTION_POLL_MAX = 2.0
+
+# 不支持 wait_by_hash 长轮询接口的节点 URL（旧版本节点），对这些节点直接使用 by_hash 轮询
+LONG_POLL_UNSUPPORTED_NODES = set()
+
+# REST 客户端连接池配置：多个并发请求复用到全节点的长连接
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
+HTTP_KEEPALIVE_EXPIRY = 90
+
+# 已竞标任务缓存的默认容量和有效期（秒）
+TASK_CACHE_MAXSIZE = 50_000
+TASK_CACHE_TTL = 3600
+
+# vector<u8> 参数的序列化器，所有交易参数共用同一个实例
+U8_SEQUENCE_SERIALIZER = Serializer.sequence_serializer(Serializer.u8)
+
 # 任务状态常量
 STATUS_PUBLISHED = 1
 STATUS_ASSIGNED = 2
@@ -34,10 +64,20 @@ STATUS_NAMES = {
     STATUS_CANCELLED: "CANCELLED"
 }
 
+# PyYAML 编译了 libyaml 时使用 C 实现的加载器，否则回退到纯 Python 实现
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # --- 核心函数 ---
 
+@functools.lru_cache(maxsize=1)
+def load_env() -> bool:
+    """加载 .env 文件（每个进程只查找和解析一次）"""
+    return load_dotenv()
+
+
+@functools.lru_cache(maxsize=8)
 def load_account_from_profile(profile: str) -> Account:
-    """从 .aptos/config.yaml 中加载指定profile的账户"""
+    """从 .aptos/config.yaml 中加载指定profile的账户（运行期间配置不变，按 profile 缓存）"""
     
     # 优先使用项目本地的配置文件，然后是全局配置文件
     # 查找项目根目录的 .aptos 配置
@@ -49,14 +89,10 @@ def load_account_from_profile(profile: str) -> Account:
     current_config_path = os.path.join(".aptos", "config.yaml")
     global_config_path = os.path.expanduser(".aptos/config.yaml")
     
-    config_path = ""
-
-    if os.path.exists(local_config_path):
-        config_path = local_config_path
-    elif os.path.exists(current_config_path):
-        config_path = current_config_path
-    elif os.path.exists(global_config_path):
-        config_path = global_config_path
+    # 按优先级依次查找，找到第一个存在的配置文件即停止
+    for config_path in (local_config_path, current_config_path, global_config_path):
+        if os.path.exists(config_path):
+            break
     else:
         raise FileNotFoundError(
             f"Aptos config file not found in:\n"
@@ -67,7 +103,7 @@ def load_account_from_profile(profile: str) -> Account:
         )
 
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YAML_LOADER)
 
     if "profiles" not in config or profile not in config["profiles"]:
         raise ValueError(f"Profile '{profile}' not found in aptos config file.")
@@ -79,6 +115,29 @@ def load_account_from_profile(profile: str) -> Account:
     return Account.load_key(private_key)
 
 
+async def create_rest_client(node_url: str = NODE_URL) -> RestClient:
+    """
+    创建使用连接池的 Aptos REST 客户端。
+    
+    SDK 默认的 httpx 连接上限较小且空闲连接很快过期，
+    这里替换为更大的连接池并延长 keep-alive，使并发查询和批量提交复用已建立的连接。
+    """
+    client = RestClient(node_url)
+    default_client = client.client
+    client.client = httpx.AsyncClient(
+        http2=client.client_config.http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=default_client.timeout,
+        headers=default_client.headers,
+    )
+    await default_client.aclose()
+    return client
+
+
 async def get_client_and_account(profile: str = DEFAULT_PROFILE) -> tuple[RestClient, Account]:
     """
     创建一个Aptos REST客户端并从指定的配置文件加载账户。
@@ -86,11 +145,102 @@ async def get_client_and_account(profile: str = DEFAULT_PROFILE) -> tuple[RestCl
     返回:
         一个元组 (RestClient, Account)
     """
-    client = RestClient(NODE_URL)
+    client = await create_rest_client()
     account = load_account_from_profile(profile)
     return client, account
 
 
+async def wait_for_transaction_info(client: RestClient, txn_hash: str) -> dict:
+    """
+    等待交易确认并直接返回已确认的交易信息。
+    
+    合并了 wait_for_transaction + transaction_by_hash 两步，
+    确认后不再额外请求一次交易详情。轮询间隔指数退避：
+    出块快时很快拿到结果，出块慢时不会频繁请求节点。
+    节点支持 wait_by_hash 长轮询时由节点侧等待，不再在客户端休眠。
+    """
+    deadline = time.monotonic() + client.client_config.transaction_wait_in_seconds
+    poll_interval = TRANSACTION_POLL_INITIAL
+    while True:
+        tx_info, long_polled = await fetch_transaction(client, txn_hash)
+        
+        if tx_info is not None and tx_info.get("type") != "pending_transaction":
+            if not tx_info.get("success"):
+                raise Exception(f"交易执行失败: {tx_info.get('vm_status')} - {txn_hash}")
+            return tx_info
+        
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"交易 {txn_hash} 等待确认超时")
+        # 节点已经在服务端等待过时立即发起下一次长轮询，否则按退避间隔休眠
+        if not long_polled:
+            await asyncio.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+            poll_interval = min(poll_interval * TRANSACTION_POLL_FACTOR, TRANSACTION_POLL_MAX)
+
+
+async def fetch_transaction(client: RestClient, txn_hash: str) -> tuple[Optional[dict], bool]:
+    """
+    查询交易，返回 (交易信息, 是否由节点长轮询返回)；交易尚未被节点索引时交易信息为 None。
+    
+    优先使用节点的 transactions/wait_by_hash 接口：交易在内存池中时节点保持请求，
+    上链后立即返回，不必在客户端按固定间隔轮询。节点不支持该接口时退回 by_hash 查询。
+    """
+    if client.base_url not in LONG_POLL_UNSUPPORTED_NODES:
+        response = await client._get(endpoint=f"transactions/wait_by_hash/{txn_hash}")
+        if response.status_code < 400:
+            tx_info = response.json()
+            return tx_info, tx_info.get("type") == "pending_transaction"
+        if response.status_code != 404:
+            raise ApiError(response.text, response.status_code)
+        try:
+            error_code = response.json().get("error_code")
+        except ValueError:
+            error_code = None
+        # 404 表示交易尚未被节点索引，继续等待
+        if error_code == "transaction_not_found":
+            return None, False
+        # 其他 404 说明节点没有该接口，之后对这个节点只使用 by_hash 查询
+        LONG_POLL_UNSUPPORTED_NODES.add(client.base_url)
+    
+    try:
+        return await client.transaction_by_hash(txn_hash), False
+    except ApiError as e:
+        # 404 表示交易尚未被节点索引，继续等待
+        if e.status_code != 404:
+            raise
+        return None, False
+
+
+def build_initialize_payload(platform_addr: str) -> EntryFunction:
+    """构建 bidding_system::initialize 交易Payload（initialize 只接收签名者，没有其他参数）"""
+    return EntryFunction.natural(
+        f"{platform_addr}::{BIDDING_MODULE}",
+        "initialize",
+        [],
+        [],
+    )
+
+
+async def send_initialize_transaction(client: RestClient, deployer_account: Account, platform_addr: str) -> Tuple[str, dict]:
+    """
+    提交 bidding_system::initialize 交易并等待确认。
+    
+    部署脚本和 Personal Agent CLI 共用此实现；这里不输出任何信息，由调用方打印或记录日志。
+    
+    返回:
+        (交易哈希, 已确认的交易信息)
+    """
+    # 生成并签名交易
+    signed_transaction = await client.create_bcs_signed_transaction(
+        deployer_account, TransactionPayload(build_initialize_payload(platform_addr))
+    )
+    
+    # 提交交易
+    txn_hash = await client.submit_bcs_transaction(signed_transaction)
+    
+    # 等待交易确认
+    return txn_hash, await wait_for_transaction_info(client, txn_hash)
+
+
 def get_platform_address(profile: str = DEFAULT_PROFILE) -> str:
     """获取平台地址（从配置文件中获取账户地址）"""
     account = load_account_from_profile(profile)
@@ -102,8 +252,9 @@ def get_function_id(platform_addr: str, function_name: str) -> str:
     return f"{platform_addr}::{BIDDING_MODULE}::{function_name}"
 
 
+@functools.lru_cache(maxsize=4096)
 def format_task_id(task_id: str) -> bytes:
-    """将字符串任务ID转换为字节数组"""
+    """将字符串任务ID转换为字节数组（结果缓存，同一任务的多次操作复用）"""
     return task_id.encode('utf-8')
 
 
@@ -113,27 +264,36 @@ def format_status(status: int) -> str:
 
 
 def format_amount(amount_octas: int) -> str:
-    """格式化金额显示（Octas转APT）"""
-    apt_amount = amount_octas / 100_000_000
+    """格式化金额显示（Octas转APT），也接受 REST API 返回的 u64 字符串"""
+    apt_amount = int(amount_octas) / 100_000_000
     return f"{apt_amount:.8f} APT ({amount_octas} Octas)"
 
 
-def print_task_info(task_data: dict):
-    """打印任务信息"""
-    print(f"任务 ID: {task_data.get('id', 'N/A')}")
-    print(f"创建者: {task_data.get('creator', 'N/A')}")
-    print(f"描述: {task_data.get('description', 'N/A')}")
-    print(f"最大预算: {format_amount(task_data.get('max_budget', 0))}")
-    print(f"截止时间: {task_data.get('deadline', 'N/A')}")
-    print(f"状态: {format_status(task_data.get('status', 0))}")
-    print(f"创建时间: {task_data.get('created_at', 'N/A')}")
+def format_task_info(task_data: dict) -> str:
+    """格式化任务信息，每个字段一行"""
+    lines = [
+        f"任务 ID: {task_data.get('id', 'N/A')}",
+        f"创建者: {task_data.get('creator', 'N/A')}",
+        f"描述: {task_data.get('description', 'N/A')}",
+        f"最大预算: {format_amount(task_data.get('max_budget', 0))}",
+        f"截止时间: {task_data.get('deadline', 'N/A')}",
+        f"状态: {format_status(task_data.get('status', 0))}",
+        f"创建时间: {task_data.get('created_at', 'N/A')}",
+    ]
     
     if task_data.get('winner') and task_data.get('winner') != "0x0":
-        print(f"中标者: {task_data.get('winner')}")
-        print(f"中标价格: {format_amount(task_data.get('winning_price', 0))}")
+        lines.append(f"中标者: {task_data.get('winner')}")
+        lines.append(f"中标价格: {format_amount(task_data.get('winning_price', 0))}")
+    
+    if int(task_data.get('completed_at', 0)) > 0:
+        lines.append(f"完成时间: {task_data.get('completed_at')}")
     
-    if task_data.get('completed_at', 0) > 0:
-        print(f"完成时间: {task_data.get('completed_at')}")
+    return "\n".join(lines)
+
+
+def print_task_info(task_data: dict):
+    """打印任务信息"""
+    print(format_task_info(task_data))
 
 
 def print_bid_info(bid_data: dict):
@@ -153,6 +313,69 @@ def print_platform_stats(stats: tuple):
     print(f"成功率: {(completed_tasks / total_tasks * 100) if total_tasks > 0 else 0:.2f}%")
 
 
+class TaskCache:
+    """
+    已竞标任务的本地缓存（LRU + TTL），持久化到 JSON 文件。
+    
+    以 task_id 为键记录 (max_budget, deadline, bid_hash)，
+    使监控服务重启或重放事件时跳过已经竞标过的任务。
+    过期时间使用墙钟时间，重启后仍然有效。
+    """
+    
+    def __init__(self, path: str, maxsize: int = TASK_CACHE_MAXSIZE, ttl: int = TASK_CACHE_TTL):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # task_id -> [max_budget, deadline, bid_hash, expires_at]
+        self._entries: OrderedDict = OrderedDict()
+    
+    def load(self):
+        """从文件加载缓存，丢弃已过期的条目"""
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return
+        
+        now = time.time()
+        self._entries = OrderedDict(
+            (task_id, entry) for task_id, entry in entries.items() if entry[3] > now
+        )
+    
+    def save(self):
+        """原子地写入缓存文件（先写临时文件再替换）"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except IOError as e:
+            print(f"    [Cache] 错误: 无法写入任务缓存 '{self.path}': {e}")
+    
+    def get(self, task_id: str) -> Optional[list]:
+        """返回未过期的缓存条目 [max_budget, deadline, bid_hash, expires_at]"""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        if entry[3] <= time.time():
+            del self._entries[task_id]
+            return None
+        self._entries.move_to_end(task_id)
+        return entry
+    
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+    
+    def add(self, task_id: str, max_budget: int, deadline: int, bid_hash: str):
+        """记录已竞标的任务，超出容量时淘汰最久未使用的条目"""
+        # 竞标截止前条目都不过期，避免截止时间较长的任务在 TTL 过后被重复竞标
+        expires_at = max(time.time() + self.ttl, deadline)
+        self._entries[task_id] = [max_budget, deadline, bid_hash, expires_at]
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
 if __name__ == '__main__':
     # 简单的测试，验证配置加载
     try:
@@ -161,4 +384,4 @@ if __name__ == '__main__':
         print(f"账户地址: {account.address()}")
         print(f"平台地址: {get_platform_address()}")
     except (FileNotFoundError, ValueError) as e:
-        print(f"错误: {e}")
\ No newline at end of file
+        print(f"错误: {e}")
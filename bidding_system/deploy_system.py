@@ -8,16 +8,10 @@ import asyncio
 import argparse
 import os
 import sys
-from dotenv import load_dotenv
-from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
-from aptos_sdk.transactions import (
-    EntryFunction,
-    TransactionPayload,
-    TransactionArgument,
-)
 from common_bidding import (
     get_client_and_account,
+    load_env,
+    send_initialize_transaction,
     DEFAULT_PROFILE
 )
 
@@ -27,7 +21,24 @@ class BiddingSystemDeployer:
     
     def __init__(self, profile: str = DEFAULT_PROFILE):
         self.profile = profile
-        load_dotenv()
+        load_env()
+        
+        # 共享的 REST 客户端和部署者账户（在 __aenter__ 中创建）
+        self._client = None
+        self._account = None
+        self._account_address = None
+    
+    async def __aenter__(self):
+        """创建共享的 REST 客户端，部署各步骤复用同一连接"""
+        self._client, self._account = await get_client_and_account(self.profile)
+        self._account_address = str(self._account.address())
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        """关闭共享的 REST 客户端"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
         
     async def deploy_and_initialize(self):
         """部署合约并初始化平台"""
@@ -36,8 +47,8 @@ class BiddingSystemDeployer:
         print("=" * 60)
         
         try:
-            client, deployer_account = await get_client_and_account(self.profile)
-            deployer_addr = str(deployer_account.address())
+            client = self._client
+            deployer_addr = self._account_address
             
             print(f"部署者地址: {deployer_addr}")
             print(f"配置文件: {self.profile}")
@@ -65,7 +76,7 @@ class BiddingSystemDeployer:
             
             # 步骤4: 初始化平台
             print("步骤4: 初始化竞标平台")
-            success = await self.initialize_platform(client, deployer_account, deployer_addr)
+            success = await self.initialize_platform()
             
             if success:
                 print("=" * 60)
@@ -90,36 +101,17 @@ class BiddingSystemDeployer:
         except Exception as e:
             print(f"部署失败: {e}")
             return False
-        finally:
-            await client.close()
             
         return True
     
-    async def initialize_platform(self, client, deployer_account, deployer_addr: str) -> bool:
+    async def initialize_platform(self) -> bool:
         """初始化平台"""
+        client, deployer_account = self._client, self._account
+        deployer_addr = self._account_address
+        
         try:
-            # 构建交易Payload
-            payload = EntryFunction.natural(
-                f"{deployer_addr}::bidding_system",
-                "initialize",
-                [],
-                [
-                    TransactionArgument(AccountAddress.from_str(deployer_addr), Serializer.struct),
-                ],
-            )
-            
-            # 生成并签名交易
-            signed_transaction = await client.create_bcs_signed_transaction(
-                deployer_account, TransactionPayload(payload)
-            )
-            
-            # 提交交易
-            txn_hash = await client.submit_bcs_transaction(signed_transaction)
-            print(f"初始化交易提交中... 哈希: {txn_hash}")
-            
-            # 等待交易确认
-            await client.wait_for_transaction(txn_hash)
-            tx_info = await client.transaction_by_hash(txn_hash)
+            txn_hash, tx_info = await send_initialize_transaction(client, deployer_account, deployer_addr)
+            print(f"初始化交易哈希: {txn_hash}")
             
             print(f"✅ 平台初始化成功! 交易版本: {tx_info['version']}")
             return True
@@ -184,31 +176,33 @@ async def main():
         await setup_accounts()
         return
     
-    deployer = BiddingSystemDeployer(args.profile)
-    
     if args.initialize_only:
         # 仅初始化平台
         try:
-            client, deployer_account = await get_client_and_account(args.profile)
-            deployer_addr = str(deployer_account.address())
-            
-            print(f"正在初始化平台... 部署者: {deployer_addr}")
-            success = await deployer.initialize_platform(client, deployer_account, deployer_addr)
-            
-            if success:
-                print("✅ 平台初始化完成!")
-            else:
-                print("❌ 平台初始化失败!")
+            async with BiddingSystemDeployer(args.profile) as deployer:
+                print(f"正在初始化平台... 配置文件: {args.profile}")
+                success = await deployer.initialize_platform()
                 
-            await client.close()
+                if success:
+                    print("✅ 平台初始化完成!")
+                else:
+                    print("❌ 平台初始化失败!")
             
         except Exception as e:
             print(f"初始化失败: {e}")
             sys.exit(1)
     else:
         # 完整部署流程
-        await deployer.deploy_and_initialize()
+        async with BiddingSystemDeployer(args.profile) as deployer:
+            await deployer.deploy_and_initialize()
 
 
 if __name__ == "__main__":
+    try:
+        # uvloop 的事件循环在套接字和定时器处理上更快，未安装时使用标准库事件循环
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main())
\ No newline at end of file
@@ -4,38 +4,75 @@ A2A-Aptos Bidding System - Personal Agent CLI
 Personal Agent 发布任务和管理竞标的命令行工具
 """
 
+from __future__ import annotations
+
 import argparse
 import asyncio
+import json
+import logging
+import logging.handlers
+import queue
+import shlex
 import uuid
 import os
 import sys
-from typing import Optional
-from dotenv import load_dotenv
-from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
-from aptos_sdk.transactions import (
-    EntryFunction,
-    TransactionPayload,
-    TransactionArgument,
+import time
+from typing import TYPE_CHECKING, List, Optional
+
+# aptos_sdk 和 common_bidding（含 dotenv）导入较慢，按需在方法内部导入，
+# 使 --help 和参数错误等不需要访问链的路径无需加载它们
+if TYPE_CHECKING:
+    from aptos_sdk.transactions import EntryFunction
+
+# 进度输出经由队列交给后台线程写出，避免同步 I/O 阻塞事件循环
+log = logging.getLogger("bidding")
+
+# --commands-file 中命令的默认并发数
+COMMAND_CONCURRENCY = 4
+
+# 批量查询任务状态时的最大并发请求数
+STATUS_QUERY_CONCURRENCY = 8
+
+# 任务状态中单条竞标的显示格式（末尾空行分隔各条竞标）
+BID_ENTRY_FORMAT = (
+    "  [{}] 竞标者: {}\n"
+    "      报价: {}\n"
+    "      声誉: {}\n"
+    "      时间: {}\n"
 )
-from common_bidding import (
-    get_client_and_account,
-    get_platform_address,
-    format_task_id,
-    format_amount,
-    format_status,
-    print_task_info,
-    STATUS_NAMES,
-    DEFAULT_PROFILE
+
+# scripts/e2e_task.move 编译后的字节码（在项目根目录执行 aptos move compile 生成）
+E2E_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "build", "aptos_task_manager", "bytecode_scripts", "e2e_task.mv"
 )
 
 
+def _start_log_listener(quiet: bool = False) -> logging.handlers.QueueListener:
+    """配置 bidding 日志：记录放入队列，由后台线程写到标准输出"""
+    log_queue = queue.Queue(-1)
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(logging.WARNING if quiet else logging.INFO)
+    log.propagate = False
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
 class PersonalAgentCLI:
     """Personal Agent 命令行工具"""
     
     def __init__(self):
+        from aptos_sdk.account_address import AccountAddress
+        from aptos_sdk.bcs import Serializer
+        from aptos_sdk.transactions import TransactionArgument
+        from common_bidding import load_env
+        
         # 加载环境变量
-        load_dotenv()
+        load_env()
         
         # 从环境变量或配置文件获取设置
         self.platform_address = os.getenv("PLATFORM_ADDRESS")
@@ -43,194 +80,424 @@ class PersonalAgentCLI:
         self.service_agent_profile = os.getenv("SERVICE_AGENT_PROFILE", "service_agent")
         
         if not self.platform_address:
-            print("错误: 请在 .env 文件中设置 PLATFORM_ADDRESS")
+            log.error("错误: 请在 .env 文件中设置 PLATFORM_ADDRESS")
             sys.exit(1)
+        
+        # 平台地址和模块ID在整个会话内不变，只解析一次
+        self._platform_addr = AccountAddress.from_str(self.platform_address)
+        self._platform_arg = TransactionArgument(self._platform_addr, Serializer.struct)
+        self._module = f"{self.platform_address}::bidding_system"
+        
+        # 共享的 REST 客户端和各 profile 的账户（在 __aenter__ 中创建）
+        self._client = None
+        self._accounts: dict = {}
+        self._account_addresses: dict = {}
+        self._account = None
+        self._account_address: Optional[str] = None
+        
+        # Personal Agent 账户的下一个序列号，首次发送交易时从链上读取，之后在本地递增
+        self._sequence_number: Optional[int] = None
+        self._sequence_lock = asyncio.Lock()
     
-    async def initialize_platform(self):
-        """初始化竞标平台"""
-        print("=" * 50)
-        print("初始化竞标平台")
-        print("=" * 50)
+    async def __aenter__(self):
+        """创建共享的 REST 客户端，并发加载 Personal Agent 和 Service Agent 账户"""
+        from common_bidding import create_rest_client, load_account_from_profile
         
-        client, deployer_account = await get_client_and_account(self.personal_agent_profile)
-        deployer_addr = str(deployer_account.address())
+        profiles = (self.personal_agent_profile, self.service_agent_profile)
+        accounts = await asyncio.gather(
+            *(asyncio.to_thread(load_account_from_profile, profile) for profile in profiles),
+            return_exceptions=True
+        )
+        self._accounts = dict(zip(profiles, accounts))
         
-        print(f"部署者: {deployer_addr}")
-        print(f"平台地址: {self.platform_address}")
-        print("")
+        # 各账户地址的十六进制字符串只格式化一次
+        self._account_addresses = {
+            profile: str(account.address())
+            for profile, account in self._accounts.items()
+            if not isinstance(account, Exception)
+        }
         
-        try:
-            # 构建交易Payload
-            payload = EntryFunction.natural(
-                f"{self.platform_address}::bidding_system",
-                "initialize",
-                [],
+        self._account = self._get_account(self.personal_agent_profile)
+        self._account_address = self._account_addresses[self.personal_agent_profile]
+        self._client = await create_rest_client()
+        return self
+    
+    def _get_account(self, profile: str):
+        """返回预先加载的账户；加载失败时抛出当时的异常"""
+        account = self._accounts[profile]
+        if isinstance(account, Exception):
+            raise account
+        return account
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        """关闭共享的 REST 客户端"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
+    def build_publish_payload(self, task_id: str, description: str, max_budget: int, deadline_seconds: int) -> EntryFunction:
+        """构建 publish_task 交易Payload"""
+        from aptos_sdk.bcs import Serializer
+        from aptos_sdk.transactions import EntryFunction, TransactionArgument
+        from common_bidding import format_task_id, U8_SEQUENCE_SERIALIZER
+        
+        return EntryFunction.natural(
+            self._module,
+            "publish_task",
+            [],
+            [
+                self._platform_arg,
+                TransactionArgument(format_task_id(task_id), U8_SEQUENCE_SERIALIZER),
+                TransactionArgument(description, Serializer.str),
+                TransactionArgument(max_budget, Serializer.u64),
+                TransactionArgument(deadline_seconds, Serializer.u64),
+            ],
+        )
+    
+    def build_select_winner_payload(self, task_id: str) -> EntryFunction:
+        """构建 select_winner 交易Payload"""
+        from aptos_sdk.transactions import EntryFunction, TransactionArgument
+        from common_bidding import format_task_id, U8_SEQUENCE_SERIALIZER
+        
+        return EntryFunction.natural(
+            self._module,
+            "select_winner",
+            [],
+            [
+                self._platform_arg,
+                TransactionArgument(format_task_id(task_id), U8_SEQUENCE_SERIALIZER),
+            ],
+        )
+    
+    def build_complete_payload(self, task_id: str) -> EntryFunction:
+        """构建 complete_task 交易Payload"""
+        from aptos_sdk.transactions import EntryFunction, TransactionArgument
+        from common_bidding import format_task_id, U8_SEQUENCE_SERIALIZER
+        
+        return EntryFunction.natural(
+            self._module,
+            "complete_task",
+            [],
+            [
+                self._platform_arg,
+                TransactionArgument(format_task_id(task_id), U8_SEQUENCE_SERIALIZER),
+            ],
+        )
+    
+    async def _sync_sequence_number(self):
+        """从链上重新读取 Personal Agent 账户的序列号"""
+        self._sequence_number = await self._client.account_sequence_number(self._account.address())
+    
+    async def _reserve_sequence_number(self) -> int:
+        """从本地维护的序列号中为 Personal Agent 的下一笔交易占用一个序列号"""
+        if self._sequence_number is None:
+            async with self._sequence_lock:
+                if self._sequence_number is None:
+                    await self._sync_sequence_number()
+        
+        # 在 await 之前占用序列号，并发签名的交易不会拿到相同的序列号
+        sequence_number = self._sequence_number
+        self._sequence_number += 1
+        return sequence_number
+    
+    async def _build_signed(self, payload: EntryFunction):
+        """使用本地维护的序列号为 Personal Agent 签名交易，避免每笔交易查询一次链上序列号"""
+        from aptos_sdk.transactions import TransactionPayload
+        
+        sequence_number = await self._reserve_sequence_number()
+        return await self._client.create_bcs_signed_transaction(
+            self._account, TransactionPayload(payload), sequence_number=sequence_number
+        )
+    
+    async def _build_signed_multi_agent(self, payload, secondary_accounts: list):
+        """
+        以 Personal Agent 为发送方构建并签名多签名交易。
+        
+        SDK 的 create_multi_agent_bcs_transaction 总是从链上读取序列号，
+        与其他命令在本地占用但尚未上链的序列号冲突，这里改用本地占用的序列号。
+        """
+        from aptos_sdk.authenticator import Authenticator, MultiAgentAuthenticator
+        from aptos_sdk.transactions import MultiAgentRawTransaction, RawTransaction, SignedTransaction
+        
+        client = self._client
+        sequence_number = await self._reserve_sequence_number()
+        raw_transaction = MultiAgentRawTransaction(
+            RawTransaction(
+                self._account.address(),
+                sequence_number,
+                payload,
+                client.client_config.max_gas_amount,
+                client.client_config.gas_unit_price,
+                int(time.time()) + client.client_config.expiration_ttl,
+                await client.chain_id(),
+            ),
+            [account.address() for account in secondary_accounts],
+        )
+        authenticator = Authenticator(
+            MultiAgentAuthenticator(
+                self._account.sign_transaction(raw_transaction),
                 [
-                    TransactionArgument(AccountAddress.from_str(deployer_addr), Serializer.struct),
+                    (account.address(), account.sign_transaction(raw_transaction))
+                    for account in secondary_accounts
                 ],
             )
-            
-            # 生成并签名交易
-            signed_transaction = await client.create_bcs_signed_transaction(
-                deployer_account, TransactionPayload(payload)
+        )
+        return SignedTransaction(raw_transaction.inner(), authenticator)
+    
+    async def _submit(self, payload: EntryFunction) -> str:
+        """签名并提交 Personal Agent 交易；本地序列号与链上不一致时重新同步后重试一次"""
+        from aptos_sdk.async_client import ApiError
+        
+        try:
+            try:
+                return await self._client.submit_bcs_transaction(await self._build_signed(payload))
+            except ApiError as e:
+                if "SEQUENCE_NUMBER" not in str(e):
+                    raise
+                await self._sync_sequence_number()
+                return await self._client.submit_bcs_transaction(await self._build_signed(payload))
+        except Exception:
+            # 占用的序列号没有被使用，本地计数已不可信，下次签名前重新同步
+            self._sequence_number = None
+            raise
+    
+    async def _simulate(self, payload: EntryFunction, account=None) -> bool:
+        """模拟执行交易并输出 Gas 和执行结果，不提交上链"""
+        from aptos_sdk.transactions import TransactionPayload
+        
+        account = account or self._account
+        sequence_number = None
+        if account is self._account:
+            if self._sequence_number is None:
+                await self._sync_sequence_number()
+            sequence_number = self._sequence_number
+        
+        raw_transaction = await self._client.create_bcs_transaction(
+            account, TransactionPayload(payload), sequence_number
+        )
+        result = (await self._client.simulate_transaction(
+            raw_transaction, account, estimate_gas_usage=True
+        ))[0]
+        
+        log.info("模拟执行结果 (交易未提交):")
+        log.info(f"  执行状态: {result['vm_status']}")
+        log.info(f"  Gas 用量: {result['gas_used']} (单价: {result['gas_unit_price']} Octas)")
+        log.info(f"  事件数量: {len(result.get('events', []))}")
+        return result["success"]
+    
+    async def run_batch(self, payloads: List[EntryFunction], account=None) -> List[str]:
+        """
+        批量提交交易。
+        
+        按顺序本地分配序列号并签名（Personal Agent 使用会话内维护的序列号），
+        然后并发提交所有交易并统一等待确认，使多笔交易落在同一或相邻区块。
+        
+        返回:
+            按提交顺序排列的交易哈希列表
+        """
+        from aptos_sdk.transactions import TransactionPayload
+        from common_bidding import wait_for_transaction_info
+        
+        client = self._client
+        
+        if account is None or account is self._account:
+            signed_transactions = [await self._build_signed(payload) for payload in payloads]
+        else:
+            base_sequence_number = await client.account_sequence_number(account.address())
+            signed_transactions = [
+                await client.create_bcs_signed_transaction(
+                    account, TransactionPayload(payload), sequence_number=base_sequence_number + i
+                )
+                for i, payload in enumerate(payloads)
+            ]
+        
+        try:
+            txn_hashes = await asyncio.gather(
+                *(client.submit_bcs_transaction(txn) for txn in signed_transactions)
             )
+        except Exception:
+            if account is None or account is self._account:
+                # 占用的序列号没有被使用，本地计数已不可信，下次签名前重新同步
+                self._sequence_number = None
+            raise
+        log.info(f"已提交 {len(txn_hashes)} 笔交易，等待确认...")
+        
+        await asyncio.gather(*(wait_for_transaction_info(client, h) for h in txn_hashes))
+        return list(txn_hashes)
+    
+    async def initialize_platform(self):
+        """初始化竞标平台"""
+        from common_bidding import build_initialize_payload, wait_for_transaction_info
+        
+        log.info("=" * 50)
+        log.info("初始化竞标平台")
+        log.info("=" * 50)
+        
+        client = self._client
+        deployer_addr = self._account_address
+        
+        log.info(f"部署者: {deployer_addr}")
+        log.info(f"平台地址: {self.platform_address}")
+        log.info("")
+        
+        try:
+            # 与其他命令一样使用本地占用的序列号，与 --commands-file 中并发的命令不冲突
+            txn_hash = await self._submit(build_initialize_payload(self.platform_address))
+            log.info(f"初始化交易哈希: {txn_hash}")
+            tx_info = await wait_for_transaction_info(client, txn_hash)
             
-            # 提交交易
-            txn_hash = await client.submit_bcs_transaction(signed_transaction)
-            print(f"交易提交中... 哈希: {txn_hash}")
-            
-            # 等待交易确认
-            await client.wait_for_transaction(txn_hash)
-            tx_info = await client.transaction_by_hash(txn_hash)
-            
-            print(f"平台初始化成功! 交易版本: {tx_info['version']}")
-            print("平台已准备就绪，可以开始发布任务。")
+            log.info(f"平台初始化成功! 交易版本: {tx_info['version']}")
+            log.info("平台已准备就绪，可以开始发布任务。")
             
             return True
             
         except Exception as e:
-            print(f"平台初始化失败: {e}")
+            log.error(f"平台初始化失败: {e}")
             return False
-        finally:
-            await client.close()
     
-    async def publish_task(self, task_id: str, description: str, max_budget: int, deadline_seconds: int):
+    async def publish_task(self, task_id: str, description: str, max_budget: int, deadline_seconds: int,
+                           dry_run: bool = False):
         """发布任务"""
-        print("=" * 50)
-        print("发布任务到竞标平台")
-        print("=" * 50)
+        from common_bidding import wait_for_transaction_info, format_amount
+        
+        log.info("=" * 50)
+        log.info("发布任务到竞标平台")
+        log.info("=" * 50)
         
-        client, creator_account = await get_client_and_account(self.personal_agent_profile)
-        creator_addr = str(creator_account.address())
+        client = self._client
+        creator_addr = self._account_address
         
-        print(f"创建者: {creator_addr}")
-        print(f"平台地址: {self.platform_address}")
-        print(f"任务 ID: {task_id}")
-        print(f"描述: {description}")
-        print(f"最大预算: {format_amount(max_budget)}")
-        print(f"截止时间: {deadline_seconds} 秒")
-        print("")
+        log.info(f"创建者: {creator_addr}")
+        log.info(f"平台地址: {self.platform_address}")
+        log.info(f"任务 ID: {task_id}")
+        log.info(f"描述: {description}")
+        log.info(f"最大预算: {format_amount(max_budget)}")
+        log.info(f"截止时间: {deadline_seconds} 秒")
+        log.info("")
         
         try:
-            # 将任务ID转换为字节数组
-            task_id_bytes = format_task_id(task_id)
-            
             # 构建交易Payload
-            payload = EntryFunction.natural(
-                f"{self.platform_address}::bidding_system",
-                "publish_task",
-                [],
-                [
-                    TransactionArgument(AccountAddress.from_str(self.platform_address), Serializer.struct),
-                    TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-                    TransactionArgument(description, Serializer.str),
-                    TransactionArgument(max_budget, Serializer.u64),
-                    TransactionArgument(deadline_seconds, Serializer.u64),
-                ],
-            )
+            payload = self.build_publish_payload(task_id, description, max_budget, deadline_seconds)
+            if dry_run:
+                return await self._simulate(payload)
             
-            # 生成并签名交易
-            signed_transaction = await client.create_bcs_signed_transaction(
-                creator_account, TransactionPayload(payload)
-            )
-            
-            # 提交交易
-            txn_hash = await client.submit_bcs_transaction(signed_transaction)
-            print(f"交易提交中... 哈希: {txn_hash}")
+            # 使用本地序列号签名并提交交易
+            txn_hash = await self._submit(payload)
+            log.info(f"交易提交中... 哈希: {txn_hash}")
             
             # 等待交易确认
-            await client.wait_for_transaction(txn_hash)
-            tx_info = await client.transaction_by_hash(txn_hash)
+            tx_info = await wait_for_transaction_info(client, txn_hash)
+            
+            log.info(f"任务发布成功! 交易版本: {tx_info['version']}")
+            log.info(f"资金已托管: {format_amount(max_budget)}")
+            log.info("")
+            log.info(f"==> 任务 '{task_id}' 已发布。请记下此ID用于后续操作。 <==")
+            log.info("接下来服务提供商可以对该任务进行竞标。")
+            
+            return True
+            
+        except Exception as e:
+            log.error(f"任务发布失败: {e}")
+            return False
+    
+    async def publish_tasks_from_file(self, path: str):
+        """
+        从 JSONL 文件批量发布任务。
+        
+        每行一个任务: {"description": ..., "budget": ..., "deadline": ..., "task_id": ...}，
+        其中 deadline 和 task_id 可省略。所有交易在本进程内签名并并发提交。
+        """
+        log.info("=" * 50)
+        log.info("批量发布任务到竞标平台")
+        log.info("=" * 50)
+        
+        try:
+            with open(path, "r") as f:
+                tasks = [json.loads(line) for line in f if line.strip()]
             
-            print(f"任务发布成功! 交易版本: {tx_info['version']}")
-            print(f"资金已托管: {format_amount(max_budget)}")
-            print("")
-            print(f"==> 任务 '{task_id}' 已发布。请记下此ID用于后续操作。 <==")
-            print("接下来服务提供商可以对该任务进行竞标。")
+            task_ids = [_task_id_or_new(task.get("task_id")) for task in tasks]
+            payloads = [
+                self.build_publish_payload(
+                    task_id, task["description"], int(task["budget"]), int(task.get("deadline", 3600))
+                )
+                for task_id, task in zip(task_ids, tasks)
+            ]
+            
+            log.info(f"创建者: {self._account_address}")
+            log.info(f"任务数量: {len(payloads)}")
+            log.info("")
+            
+            txn_hashes = await self.run_batch(payloads)
+            
+            log.info(f"批量发布成功! 共 {len(txn_hashes)} 个任务:")
+            for task_id, txn_hash in zip(task_ids, txn_hashes):
+                log.info(f"  {task_id}  交易哈希: {txn_hash}")
             
             return True
             
         except Exception as e:
-            print(f"任务发布失败: {e}")
+            log.error(f"批量发布失败: {e}")
             return False
-        finally:
-            await client.close()
     
-    async def select_winner(self, task_id: str):
+    async def select_winner(self, task_id: str, dry_run: bool = False):
         """选择中标者"""
-        print("=" * 50)
-        print("选择任务中标者")
-        print("=" * 50)
+        from common_bidding import wait_for_transaction_info
+        
+        log.info("=" * 50)
+        log.info("选择任务中标者")
+        log.info("=" * 50)
         
-        client, creator_account = await get_client_and_account(self.personal_agent_profile)
-        creator_addr = str(creator_account.address())
+        client = self._client
+        creator_addr = self._account_address
         
-        print(f"执行者: {creator_addr}")
-        print(f"任务 ID: {task_id}")
-        print("")
+        log.info(f"执行者: {creator_addr}")
+        log.info(f"任务 ID: {task_id}")
+        log.info("")
         
         try:
             # 构建交易Payload
-            task_id_bytes = format_task_id(task_id)
-            payload = EntryFunction.natural(
-                f"{self.platform_address}::bidding_system",
-                "select_winner",
-                [],
-                [
-                    TransactionArgument(AccountAddress.from_str(self.platform_address), Serializer.struct),
-                    TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-                ],
-            )
+            payload = self.build_select_winner_payload(task_id)
+            if dry_run:
+                return await self._simulate(payload)
             
-            # 生成并签名交易
-            signed_transaction = await client.create_bcs_signed_transaction(
-                creator_account, TransactionPayload(payload)
-            )
-            
-            # 提交交易
-            txn_hash = await client.submit_bcs_transaction(signed_transaction)
-            print(f"交易提交中... 哈希: {txn_hash}")
+            # 使用本地序列号签名并提交交易
+            txn_hash = await self._submit(payload)
+            log.info(f"交易提交中... 哈希: {txn_hash}")
             
             # 等待交易确认
-            await client.wait_for_transaction(txn_hash)
-            tx_info = await client.transaction_by_hash(txn_hash)
+            tx_info = await wait_for_transaction_info(client, txn_hash)
             
-            print(f"中标者选择成功! 交易版本: {tx_info['version']}")
-            print("任务已分配给中标者。")
+            log.info(f"中标者选择成功! 交易版本: {tx_info['version']}")
+            log.info("任务已分配给中标者。")
             
             return True
             
         except Exception as e:
-            print(f"选择中标者失败: {e}")
+            log.error(f"选择中标者失败: {e}")
             return False
-        finally:
-            await client.close()
     
-    async def complete_task(self, task_id: str):
+    async def complete_task(self, task_id: str, dry_run: bool = False):
         """完成任务 (由Service Agent执行)"""
-        print("=" * 50)
-        print("完成任务")
-        print("=" * 50)
+        from aptos_sdk.transactions import TransactionPayload
+        from common_bidding import wait_for_transaction_info
         
-        client, service_account = await get_client_and_account(self.service_agent_profile)
-        service_addr = str(service_account.address())
+        log.info("=" * 50)
+        log.info("完成任务")
+        log.info("=" * 50)
         
-        print(f"Service Agent: {service_addr}")
-        print(f"任务 ID: {task_id}")
-        print("")
+        client = self._client
+        service_account = self._get_account(self.service_agent_profile)
+        service_addr = self._account_addresses[self.service_agent_profile]
+        
+        log.info(f"Service Agent: {service_addr}")
+        log.info(f"任务 ID: {task_id}")
+        log.info("")
         
         try:
             # 构建交易Payload
-            task_id_bytes = format_task_id(task_id)
-            payload = EntryFunction.natural(
-                f"{self.platform_address}::bidding_system",
-                "complete_task",
-                [],
-                [
-                    TransactionArgument(AccountAddress.from_str(self.platform_address), Serializer.struct),
-                    TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-                ],
-            )
+            payload = self.build_complete_payload(task_id)
+            if dry_run:
+                return await self._simulate(payload, service_account)
             
             # 生成并签名交易
             signed_transaction = await client.create_bcs_signed_transaction(
@@ -239,88 +506,191 @@ class PersonalAgentCLI:
             
             # 提交交易
             txn_hash = await client.submit_bcs_transaction(signed_transaction)
-            print(f"交易提交中... 哈希: {txn_hash}")
+            log.info(f"交易提交中... 哈希: {txn_hash}")
             
             # 等待交易确认
-            await client.wait_for_transaction(txn_hash)
-            tx_info = await client.transaction_by_hash(txn_hash)
+            tx_info = await wait_for_transaction_info(client, txn_hash)
             
-            print(f"任务完成成功! 交易版本: {tx_info['version']}")
-            print("资金已结算给Service Agent。")
+            log.info(f"任务完成成功! 交易版本: {tx_info['version']}")
+            log.info("资金已结算给Service Agent。")
             
             return True
             
         except Exception as e:
-            print(f"完成任务失败: {e}")
+            log.error(f"完成任务失败: {e}")
             return False
-        finally:
-            await client.close()
     
-    async def get_task_status(self, task_id: str):
-        """查询任务状态"""
-        print("=" * 50)
-        print("查询任务状态")
-        print("=" * 50)
+    async def run_e2e_task(self, task_id: str, description: str, max_budget: int, deadline_seconds: int,
+                           bid_price: int, reputation_score: int, script_path: str = E2E_SCRIPT_PATH):
+        """在一笔多签名交易中完成 发布 → 竞标 → 选择中标者 → 完成 的整个流程"""
+        from aptos_sdk.transactions import Script, ScriptArgument, TransactionPayload
+        from common_bidding import wait_for_transaction_info, format_task_id, format_amount
+        
+        log.info("=" * 50)
+        log.info("端到端执行任务 (单笔交易)")
+        log.info("=" * 50)
         
-        client, _ = await get_client_and_account(self.personal_agent_profile)
+        client = self._client
+        service_account = self._get_account(self.service_agent_profile)
+        
+        log.info(f"创建者: {self._account_address}")
+        log.info(f"Service Agent: {self._account_addresses[self.service_agent_profile]}")
+        log.info(f"任务 ID: {task_id}")
+        log.info(f"最大预算: {format_amount(max_budget)}")
+        log.info(f"竞标价格: {format_amount(bid_price)}")
+        log.info("")
         
         try:
-            # 获取 BiddingPlatform 资源
-            resource_type = f"{self.platform_address}::bidding_system::BiddingPlatform"
-            resource = await client.account_resource(
-                AccountAddress.from_str(self.platform_address),
-                resource_type
+            with open(script_path, "rb") as f:
+                code = f.read()
+            
+            script = Script(code, [], [
+                ScriptArgument(ScriptArgument.ADDRESS, self._platform_addr),
+                ScriptArgument(ScriptArgument.U8_VECTOR, format_task_id(task_id)),
+                ScriptArgument(ScriptArgument.U8_VECTOR, description.encode("utf-8")),
+                ScriptArgument(ScriptArgument.U64, max_budget),
+                ScriptArgument(ScriptArgument.U64, deadline_seconds),
+                ScriptArgument(ScriptArgument.U64, bid_price),
+                ScriptArgument(ScriptArgument.U64, reputation_score),
+            ])
+            
+            # Personal Agent 为发送方，Service Agent 为第二签名方
+            # 序列号与其他命令一样从本地占用，并发执行的命令不会拿到相同的序列号
+            signed_transaction = await self._build_signed_multi_agent(
+                TransactionPayload(script), [service_account]
             )
+            try:
+                txn_hash = await client.submit_bcs_transaction(signed_transaction)
+            except Exception:
+                # 占用的序列号没有被使用，本地计数已不可信，下次签名前重新同步
+                self._sequence_number = None
+                raise
+            log.info(f"交易提交中... 哈希: {txn_hash}")
             
-            # 获取 tasks 表的句柄
-            tasks_handle = resource["data"]["tasks"]["inner"]["buckets"]["inner"]["buckets"][0]["inner"]["kvs"][0]["key"]
+            tx_info = await wait_for_transaction_info(client, txn_hash)
             
-            # 查询具体任务
-            key_type = "vector<u8>"
-            value_type = f"{self.platform_address}::bidding_system::Task"
-            task_id_hex = task_id.encode('utf-8').hex()
-            
-            task_data = await client.get_table_item(
-                tasks_handle,
-                key_type,
-                value_type,
-                task_id_hex
-            )
-            
-            print(f"任务 ID: {task_id}")
-            print_task_info(task_data)
-            
-            # 显示竞标信息
-            bids = task_data.get('bids', [])
-            if bids:
-                print(f"竞标数量: {len(bids)}")
-                print("竞标列表:")
-                for i, bid in enumerate(bids, 1):
-                    print(f"  [{i}] 竞标者: {bid['bidder']}")
-                    print(f"      报价: {format_amount(bid['price'])}")
-                    print(f"      声誉: {bid['reputation_score']}")
-                    print(f"      时间: {bid['timestamp']}")
-                    print()
-            else:
-                print("竞标列表: 无竞标或已清空")
+            log.info(f"任务端到端执行成功! 交易版本: {tx_info['version']}")
+            log.info(f"已结算给Service Agent: {format_amount(bid_price)}")
             
             return True
             
         except Exception as e:
-            print(f"查询任务状态失败: {e}")
+            log.error(f"端到端执行失败: {e}")
             return False
-        finally:
-            await client.close()
+    
+    async def _fetch_task(self, task_id: str) -> dict:
+        """通过 get_task 视图函数读取单个任务"""
+        from common_bidding import format_task_id
+        
+        result = await self._client.view(
+            f"{self._module}::get_task",
+            [],
+            [self.platform_address, "0x" + format_task_id(task_id).hex()]
+        )
+        return json.loads(result)[0]
+    
+    def _format_task_status(self, task_id: str, task_data: dict) -> str:
+        """格式化任务状态和竞标列表"""
+        from common_bidding import format_task_info, format_amount
+        
+        lines = [f"任务 ID: {task_id}", format_task_info(task_data)]
+        
+        # 显示竞标信息
+        bids = task_data.get('bids', [])
+        if bids:
+            lines.extend([f"竞标数量: {len(bids)}", "竞标列表:"])
+            lines.extend(
+                BID_ENTRY_FORMAT.format(
+                    i, bid['bidder'], format_amount(bid['price']), bid['reputation_score'], bid['timestamp']
+                )
+                for i, bid in enumerate(bids, 1)
+            )
+        else:
+            lines.append("竞标列表: 无竞标或已清空")
+        return "\n".join(lines)
+    
+    async def get_task_status(self, task_id: str):
+        """查询任务状态"""
+        return await self.get_task_statuses([task_id])
+    
+    async def get_task_statuses(self, task_ids: List[str]):
+        """并发查询多个任务的状态"""
+        log.info("=" * 50)
+        log.info("查询任务状态")
+        log.info("=" * 50)
+        
+        # 限制并发请求数，避免压垮全节点
+        semaphore = asyncio.Semaphore(STATUS_QUERY_CONCURRENCY)
+        
+        async def fetch(task_id: str) -> dict:
+            async with semaphore:
+                return await self._fetch_task(task_id)
+        
+        results = await asyncio.gather(
+            *(fetch(task_id) for task_id in task_ids),
+            return_exceptions=True
+        )
+        
+        # 每个任务的状态作为一条日志写出，并发执行的命令输出不会交错在任务内部
+        success = True
+        for task_id, result in zip(task_ids, results):
+            if isinstance(result, Exception):
+                log.error(f"查询任务 '{task_id}' 状态失败: {result}\n")
+                success = False
+            else:
+                log.info(self._format_task_status(task_id, result) + "\n")
+        
+        return success
+
+
+def _task_id_or_new(task_id: Optional[str]) -> str:
+    """返回指定的任务ID，未指定时自动生成"""
+    return task_id if task_id else f"task-{uuid.uuid4().hex[:8]}"
+
+
+# 子命令 -> 处理协程
+COMMAND_HANDLERS = {
+    "init": lambda cli, args: cli.initialize_platform(),
+    "publish": lambda cli, args: cli.publish_task(
+        _task_id_or_new(args.task_id), args.description, args.budget, args.deadline, args.dry_run
+    ),
+    "publish-batch": lambda cli, args: cli.publish_tasks_from_file(args.file),
+    "select-winner": lambda cli, args: cli.select_winner(args.task_id, args.dry_run),
+    "complete": lambda cli, args: cli.complete_task(args.task_id, args.dry_run),
+    "e2e": lambda cli, args: cli.run_e2e_task(
+        _task_id_or_new(args.task_id), args.description, args.budget, args.deadline,
+        args.bid_price if args.bid_price else args.budget, args.reputation, args.script
+    ),
+    "status": lambda cli, args: cli.get_task_statuses(args.task_ids),
+}
+
+
+def _read_commands_file(parser: argparse.ArgumentParser, path: str) -> List[argparse.Namespace]:
+    """读取命令文件，每行一条子命令（忽略空行和 # 注释），先全部解析再执行"""
+    commands = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            command_args = parser.parse_args(shlex.split(line))
+            if command_args.command is None:
+                parser.error(f"命令文件中的行缺少子命令: {line}")
+            commands.append(command_args)
+    return commands
 
 
 async def main():
     """主入口函数"""
-    cli = PersonalAgentCLI()
-    
     parser = argparse.ArgumentParser(
         description="A2A-Aptos Personal Agent CLI - 与竞标平台交互的工具"
     )
-    subparsers = parser.add_subparsers(dest="command", required=True, help="可用的子命令")
+    parser.add_argument("--quiet", action="store_true", help="只输出警告和错误，不显示进度信息")
+    parser.add_argument("--commands-file", type=str,
+                        help="从文件读取多条子命令 (每行一条)，在同一进程中共享连接和序列号并发执行")
+    parser.add_argument("--concurrency", type=int, default=COMMAND_CONCURRENCY,
+                        help=f"--commands-file 中命令的最大并发数 (默认为{COMMAND_CONCURRENCY}，设为1则按顺序执行)")
+    subparsers = parser.add_subparsers(dest="command", help="可用的子命令")
     
     # 初始化平台
     subparsers.add_parser("init", help="初始化平台 (仅需在部署后执行一次)")
@@ -334,39 +704,83 @@ async def main():
                            help="竞标截止时间 (从当前开始的秒数，默认为3600秒)")
     p_publish.add_argument("--task-id", type=str,
                            help="任务ID (不指定则自动生成)")
+    p_publish.add_argument("--dry-run", action="store_true", help="只模拟执行并显示 Gas 消耗，不提交交易")
+    
+    # 批量发布任务
+    p_batch = subparsers.add_parser("publish-batch", help="从 JSONL 文件批量发布任务 (一次签名并发提交)")
+    p_batch.add_argument("file", type=str,
+                         help='每行一个任务的 JSONL 文件，如 {"description": "...", "budget": 100000000}')
     
     # 选择中标者
     p_select = subparsers.add_parser("select-winner", help="为任务选择一个中标者")
     p_select.add_argument("task_id", type=str, help="从 'publish' 命令获取的任务 ID")
+    p_select.add_argument("--dry-run", action="store_true", help="只模拟执行并显示 Gas 消耗，不提交交易")
     
     # 完成任务
     p_complete = subparsers.add_parser("complete", help="标记任务完成 (由中标的 Service Agent 执行)")
     p_complete.add_argument("task_id", type=str, help="任务 ID")
+    p_complete.add_argument("--dry-run", action="store_true", help="只模拟执行并显示 Gas 消耗，不提交交易")
+    
+    # 端到端执行 (单笔交易)
+    p_e2e = subparsers.add_parser("e2e", help="在一笔交易中完成发布、竞标、选择中标者和完成任务")
+    p_e2e.add_argument("description", type=str, help="任务的详细描述")
+    p_e2e.add_argument("--budget", type=int, required=True,
+                       help="最高预算 (单位: Octas)")
+    p_e2e.add_argument("--bid-price", type=int,
+                       help="Service Agent 的报价 (单位: Octas，默认等于预算)")
+    p_e2e.add_argument("--reputation", type=int, default=90,
+                       help="Service Agent 的信誉评分 (默认为90)")
+    p_e2e.add_argument("--deadline", type=int, default=3600,
+                       help="竞标截止时间 (从当前开始的秒数，默认为3600秒)")
+    p_e2e.add_argument("--task-id", type=str,
+                       help="任务ID (不指定则自动生成)")
+    p_e2e.add_argument("--script", type=str, default=E2E_SCRIPT_PATH,
+                       help="e2e_task 脚本的编译字节码路径")
     
     # 查询状态
     p_status = subparsers.add_parser("status", help="查询任务的详细状态")
-    p_status.add_argument("task_id", type=str, help="任务 ID")
+    p_status.add_argument("task_ids", type=str, nargs="+", help="任务 ID (可指定多个)")
     
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency 必须大于等于1")
+    if args.commands_file:
+        commands = _read_commands_file(parser, args.commands_file)
+    elif args.command:
+        commands = [args]
+    else:
+        parser.error("请指定子命令或 --commands-file")
+    
+    log_listener = _start_log_listener(args.quiet)
     
     try:
-        if args.command == "init":
-            await cli.initialize_platform()
-        elif args.command == "publish":
-            task_id = args.task_id if args.task_id else f"task-{uuid.uuid4().hex[:8]}"
-            await cli.publish_task(task_id, args.description, args.budget, args.deadline)
-        elif args.command == "select-winner":
-            await cli.select_winner(args.task_id)
-        elif args.command == "complete":
-            await cli.complete_task(args.task_id)
-        elif args.command == "status":
-            await cli.get_task_status(args.task_id)
+        async with PersonalAgentCLI() as cli:
+            semaphore = asyncio.Semaphore(args.concurrency)
+            
+            async def run(command_args: argparse.Namespace) -> bool:
+                async with semaphore:
+                    return await COMMAND_HANDLERS[command_args.command](cli, command_args)
+            
+            results = await asyncio.gather(*(run(command_args) for command_args in commands))
+        
+        if not all(results):
+            log.error("部分命令执行失败!")
+            sys.exit(1)
     except KeyboardInterrupt:
-        print("\n操作已取消")
+        log.info("\n操作已取消")
     except Exception as e:
-        print(f"执行失败: {e}")
+        log.error(f"执行失败: {e}")
         sys.exit(1)
+    finally:
+        log_listener.stop()
 
 
 if __name__ == "__main__":
+    try:
+        # uvloop 的事件循环在套接字和定时器处理上更快，未安装时使用标准库事件循环
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main())
\ No newline at end of file
@@ -5,43 +5,117 @@ A2A-Aptos Bidding System - Service Agent 监控服务
 """
 
 import time
-import requests
+import httpx
 import json
 import os
 import asyncio
 import sys
 import signal
+import logging
+import logging.handlers
+import queue
+from fractions import Fraction
 from typing import Dict, List, Optional
-from dotenv import load_dotenv
 from aptos_sdk.bcs import Serializer
 from aptos_sdk.account_address import AccountAddress
 from aptos_sdk.transactions import (
     EntryFunction,
+    ModuleId,
     TransactionPayload,
     TransactionArgument,
 )
 from common_bidding import (
-    get_client_and_account,
+    create_rest_client,
+    load_account_from_profile,
+    load_env,
+    wait_for_transaction_info,
     format_task_id,
+    U8_SEQUENCE_SERIALIZER,
     format_amount,
+    TaskCache,
     DEFAULT_PROFILE
 )
 
-# 全局停止事件
-shutdown_event = asyncio.Event()
+try:
+    # orjson 编码 Indexer 请求、解析 Indexer 响应更快，未安装时回退到标准库
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+try:
+    # Python 3.11+ 的 asyncio.timeout 直接在当前任务上计时，不会像 wait_for 那样每次额外创建 Task
+    from asyncio import timeout as async_timeout
+except ImportError:
+    from async_timeout import timeout as async_timeout
+
+# Indexer 客户端保持的最大空闲长连接数
+INDEXER_MAX_KEEPALIVE_CONNECTIONS = 10
+
+# Indexer 每页返回的事件数，以及单次轮询最多连续读取的页数
+INDEXER_PAGE_SIZE = 100
+INDEXER_MAX_PAGES = 10
+
+# 查询新任务发布事件的 GraphQL 文档，模块加载时折叠空白，每次轮询不再发送缩进
+TASK_EVENTS_QUERY = " ".join("""
+query GetNewTaskEvents($platform_address: String!, $event_type: String!, $last_seq_num: bigint!, $limit: Int!) {
+  events(
+    where: {
+      account_address: { _eq: $platform_address },
+      type: { _eq: $event_type },
+      sequence_number: { _gt: $last_seq_num }
+    },
+    order_by: { sequence_number: asc },
+    limit: $limit
+  ) {
+    sequence_number
+    task_id: data(path: "task_id")
+    max_budget: data(path: "max_budget")
+    deadline: data(path: "deadline")
+  }
+}
+""".split())
 
-def signal_handler(signum, frame):
-    """信号处理器"""
-    print(f"\n收到信号 {signum}，正在优雅停止服务...")
+# 有未保存的事件时，距上次保存超过该秒数也会写入状态文件
+STATE_FLUSH_INTERVAL = 5
+
+# 连续空轮询时轮询间隔的增长倍数
+POLL_BACKOFF_FACTOR = 1.5
+
+# 监控日志经由队列交给后台线程写出，避免同步 I/O 阻塞事件循环
+log = logging.getLogger("monitor")
+
+def request_shutdown(signum: int, shutdown_event: asyncio.Event):
+    """信号处理器（在事件循环线程中执行）"""
+    log.info(f"收到信号 {signum}，正在优雅停止服务...")
     shutdown_event.set()
 
 
+def _start_log_listener(level: str = "INFO") -> logging.handlers.QueueListener:
+    """配置 monitor 日志：记录放入队列，由后台线程写到标准输出"""
+    log_queue = queue.Queue(-1)
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(level.upper())
+    log.propagate = False
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
 class ServiceAgentMonitor:
     """Service Agent 监控和竞标服务"""
     
-    def __init__(self):
+    def __init__(self, shutdown_event: asyncio.Event):
+        # 停止事件由 main() 在运行中的事件循环里创建（Python 3.8/3.9 的 Event 会绑定创建时的事件循环）
+        self.shutdown_event = shutdown_event
+        
         # 加载环境变量
-        load_dotenv()
+        load_env()
         
         # 从环境变量获取配置
         self.platform_address = os.getenv("PLATFORM_ADDRESS")
@@ -51,38 +125,102 @@ class ServiceAgentMonitor:
         
         # 监控配置
         self.poll_interval = int(os.getenv("MONITOR_POLL_INTERVAL", 30))
-        self.bid_price_ratio = float(os.getenv("BID_PRICE_RATIO", 0.8))
+        # 自适应轮询：发现任务后缩短到最小间隔，空轮询时逐步放大到最大间隔
+        self.min_interval = float(os.getenv("MONITOR_MIN_INTERVAL", 2))
+        self.max_interval = float(os.getenv("MONITOR_MAX_INTERVAL", 60))
+        self._current_interval = self.poll_interval
+        # 竞标比例保存为分数，用整数运算计算出价，超过 2^53 的预算也不会丢失精度
+        self.bid_price_ratio = Fraction(os.getenv("BID_PRICE_RATIO", "0.8")).limit_denominator(10_000)
         self.reputation_score = int(os.getenv("SERVICE_AGENT_REPUTATION", 90))
         
-        # 状态文件
+        # 同时进行中的竞标交易上限，避免一批事件过多时压垮节点
+        self.max_concurrent_bids = int(os.getenv("MAX_CONCURRENT_BIDS", 5))
+        self._bid_semaphore = asyncio.Semaphore(self.max_concurrent_bids)
+        
+        # 一次轮询发现多个新任务时，用 place_bids_batch 在一笔交易中全部竞标（需合约包含该函数）
+        self.batch_bids = os.getenv("MONITOR_BATCH_BIDS", "false").lower() == "true"
+        
+        # 状态文件：每处理 save_every 个事件或每隔 STATE_FLUSH_INTERVAL 秒写一次（停止时总会写入）
         self.state_file = "monitor_state.json"
+        self.save_every = int(os.getenv("MONITOR_SAVE_EVERY", 10))
+        self._unsaved_events = 0
+        self._last_flush = time.monotonic()
+        
+        # 已竞标任务缓存，重启或重放事件时跳过已竞标的任务
+        self.task_cache = TaskCache("task_cache.json")
+        self.task_cache.load()
+        
+        # 共享的 REST 客户端和 Service Agent 账户（在 __aenter__ 中创建）
+        self._client = None
+        self._account = None
+        
+        # Indexer 的 HTTP 客户端（在 __aenter__ 中创建），各次轮询复用同一长连接
+        self._http = None
         
         # 事件类型
         self.event_type = f"{self.platform_address}::bidding_system::TaskPublishedEvent"
         
         # 验证必要配置
         if not self.platform_address:
-            print("错误: 请在 .env 文件中设置 PLATFORM_ADDRESS")
+            log.error("错误: 请在 .env 文件中设置 PLATFORM_ADDRESS")
             sys.exit(1)
         
-        print("--- Service Agent 监控服务初始化 ---")
-        print(f"平台地址: {self.platform_address}")
-        print(f"节点URL: {self.node_url}")
-        print(f"索引器URL: {self.indexer_url}")
-        print(f"轮询间隔: {self.poll_interval}秒")
-        print(f"竞标策略: {self.bid_price_ratio * 100}%预算")
-        print(f"信誉评分: {self.reputation_score}")
-        print("----------------------------------")
+        # 平台地址在整个运行期间不变，只解析一次
+        self._platform_addr = AccountAddress.from_str(self.platform_address)
+        
+        # place_bid 的模块ID、平台地址和信誉参数不变，预先构建并完成 BCS 编码，
+        # 每次竞标只需编码 task_id 和价格两个参数
+        self._bidding_module = ModuleId(self._platform_addr, "bidding_system")
+        self._platform_arg_bytes = TransactionArgument(self._platform_addr, Serializer.struct).encode()
+        self._reputation_arg_bytes = TransactionArgument(self.reputation_score, Serializer.u64).encode()
+        
+        log.info("--- Service Agent 监控服务初始化 ---")
+        log.info(f"平台地址: {self.platform_address}")
+        log.info(f"节点URL: {self.node_url}")
+        log.info(f"索引器URL: {self.indexer_url}")
+        log.info(f"轮询间隔: {self.poll_interval}秒 (自适应范围 {self.min_interval}-{self.max_interval}秒)")
+        log.info(f"竞标策略: {float(self.bid_price_ratio * 100)}%预算")
+        log.info(f"信誉评分: {self.reputation_score}")
+        log.info(f"最大并发竞标数: {self.max_concurrent_bids}")
+        log.info(f"批量竞标: {'开启' if self.batch_bids else '关闭'}")
+        log.info("----------------------------------")
+    
+    async def __aenter__(self):
+        """创建共享的 REST 客户端和 Indexer 客户端，所有竞标交易和轮询复用连接"""
+        self._client = await create_rest_client(self.node_url)
+        self._http = httpx.AsyncClient(
+            http2=True,
+            # 请求体自行编码为 JSON；显式要求 gzip 压缩的响应，事件较多时显著减少传输字节
+            headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"},
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=INDEXER_MAX_KEEPALIVE_CONNECTIONS),
+        )
+        self._account = load_account_from_profile(self.service_agent_profile)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        """关闭共享的 REST 客户端和 Indexer 客户端"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
     
     def save_state(self, last_sequence_number: int):
         """保存最后处理的事件序列号"""
         state = {"last_processed_sequence_number": last_sequence_number}
+        tmp_file = f"{self.state_file}.tmp"
         try:
-            with open(self.state_file, "w") as f:
+            # 先写临时文件再原子替换，避免中途退出留下损坏的状态文件
+            with open(tmp_file, "w") as f:
                 json.dump(state, f)
-            print(f"    [State] 状态已保存，序列号: {last_sequence_number}")
+            os.replace(tmp_file, self.state_file)
+            self._unsaved_events = 0
+            self._last_flush = time.monotonic()
+            log.info(f"[State] 状态已保存，序列号: {last_sequence_number}")
         except IOError as e:
-            print(f"    [State] 错误: 无法写入状态文件 '{self.state_file}': {e}")
+            log.error(f"[State] 错误: 无法写入状态文件 '{self.state_file}': {e}")
     
     def load_state(self) -> int:
         """加载上次处理的事件序列号"""
@@ -94,203 +232,326 @@ class ServiceAgentMonitor:
                 state = json.load(f)
                 return int(state.get("last_processed_sequence_number", 0))
         except (IOError, json.JSONDecodeError) as e:
-            print(f"    [State] 警告: 无法读取状态文件，从头开始。错误: {e}")
+            log.warning(f"[State] 警告: 无法读取状态文件，从头开始。错误: {e}")
             return 0
     
-    def query_indexer_for_new_tasks(self, last_processed_seq_num: int) -> List[Dict]:
-        """通过Indexer API查询新的任务发布事件"""
-        query = """
-        query GetNewTaskEvents($platform_address: String!, $event_type: String!, $last_seq_num: bigint!) {
-          events(
-            where: {
-              account_address: { _eq: $platform_address },
-              type: { _eq: $event_type },
-              sequence_number: { _gt: $last_seq_num }
-            },
-            order_by: { sequence_number: asc },
-            limit: 25
-          ) {
-            sequence_number
-            data
-          }
-        }
+    async def query_indexer_for_new_tasks(self, last_processed_seq_num: int) -> List[Dict]:
         """
+        通过Indexer API查询新的任务发布事件。
         
-        variables = {
-            "platform_address": self.platform_address,
-            "event_type": self.event_type,
-            "last_seq_num": last_processed_seq_num
-        }
+        只取竞标需要的字段（不下载任务描述等完整事件数据），
+        并按序列号游标连续翻页，一次轮询即可取完积压的事件。
+        """
+        all_events = []
+        cursor = last_processed_seq_num
         
-        try:
-            response = requests.post(
-                self.indexer_url,
-                json={"query": query, "variables": variables},
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            if "errors" in data:
-                print(f"GraphQL查询错误: {data['errors']}")
-                return []
+        for _ in range(INDEXER_MAX_PAGES):
+            variables = {
+                "platform_address": self.platform_address,
+                "event_type": self.event_type,
+                "last_seq_num": cursor,
+                "limit": INDEXER_PAGE_SIZE
+            }
             
-            events = data.get("data", {}).get("events", [])
-            return events
+            try:
+                response = await self._http.post(
+                    self.indexer_url,
+                    content=json_dumps({"query": TASK_EVENTS_QUERY, "variables": variables})
+                )
+                response.raise_for_status()
+                
+                data = json_loads(response.content)
+                if "errors" in data:
+                    log.error(f"GraphQL查询错误: {data['errors']}")
+                    break
+                
+                events = data.get("data", {}).get("events", [])
+                
+            except httpx.HTTPError as e:
+                log.error(f"索引器查询错误: {e}")
+                break
+            except json.JSONDecodeError as e:
+                log.error(f"JSON解析错误: {e}")
+                break
             
-        except requests.RequestException as e:
-            print(f"索引器查询错误: {e}")
-            return []
-        except json.JSONDecodeError as e:
-            print(f"JSON解析错误: {e}")
-            return []
+            all_events.extend(events)
+            if len(events) < INDEXER_PAGE_SIZE:
+                break
+            cursor = int(events[-1]["sequence_number"])
+        
+        return all_events
     
-    async def place_bid(self, task_id: str, bid_price: int, reputation: int) -> bool:
-        """提交竞标"""
-        print(f"为任务 '{task_id}' 竞标, 价格: {format_amount(bid_price)}, 信誉: {reputation}")
+    async def place_bid(self, task_id: str, bid_price: int, reputation: int,
+                        sequence_number: Optional[int] = None) -> Optional[str]:
+        """提交竞标，成功时返回交易哈希，失败时返回 None"""
+        log.info(f"为任务 '{task_id}' 竞标, 价格: {format_amount(bid_price)}, 信誉: {reputation}")
         
         try:
-            client, bidder_account = await get_client_and_account(self.service_agent_profile)
-            bidder_addr = str(bidder_account.address())
+            client, bidder_account = self._client, self._account
+            
+            # 使用配置的信誉评分时直接复用预编码的参数
+            if reputation == self.reputation_score:
+                reputation_arg_bytes = self._reputation_arg_bytes
+            else:
+                reputation_arg_bytes = TransactionArgument(reputation, Serializer.u64).encode()
             
             # 构建交易Payload
-            task_id_bytes = format_task_id(task_id)
-            payload = EntryFunction.natural(
-                f"{self.platform_address}::bidding_system",
+            payload = EntryFunction(
+                self._bidding_module,
                 "place_bid",
                 [],
                 [
-                    TransactionArgument(AccountAddress.from_str(self.platform_address), Serializer.struct),
-                    TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-                    TransactionArgument(bid_price, Serializer.u64),
-                    TransactionArgument(reputation, Serializer.u64),
+                    self._platform_arg_bytes,
+                    TransactionArgument(format_task_id(task_id), U8_SEQUENCE_SERIALIZER).encode(),
+                    TransactionArgument(bid_price, Serializer.u64).encode(),
+                    reputation_arg_bytes,
                 ],
             )
             
             # 生成并签名交易
             signed_transaction = await client.create_bcs_signed_transaction(
-                bidder_account, TransactionPayload(payload)
+                bidder_account, TransactionPayload(payload), sequence_number=sequence_number
             )
             
             # 提交交易
             txn_hash = await client.submit_bcs_transaction(signed_transaction)
-            print(f"  > 交易提交中... 哈希: {txn_hash}")
+            log.info(f"  > 交易提交中... 哈希: {txn_hash}")
             
             # 等待交易确认
-            await client.wait_for_transaction(txn_hash)
-            tx_info = await client.transaction_by_hash(txn_hash)
+            tx_info = await wait_for_transaction_info(client, txn_hash)
             
-            print(f"  > ✅ 竞标成功! 交易版本: {tx_info['version']}")
-            await client.close()
-            return True
+            log.info(f"  > ✅ 竞标成功! 交易版本: {tx_info['version']}")
+            return txn_hash
             
         except Exception as e:
-            print(f"  > ❌ 竞标失败: {e}")
-            return False
+            log.error(f"  > ❌ 竞标失败: {e}")
+            return None
+    
+    async def place_bids_batch(self, events: List[Dict]) -> Optional[str]:
+        """在一笔交易中为多个任务竞标，成功时返回交易哈希，失败时返回 None"""
+        task_ids = [event["task_id"] for event in events]
+        bid_prices = [self._bid_price(int(event["max_budget"])) for event in events]
+        log.info(f"批量竞标 {len(task_ids)} 个任务: {', '.join(task_ids)}")
+        
+        try:
+            payload = EntryFunction(
+                self._bidding_module,
+                "place_bids_batch",
+                [],
+                [
+                    self._platform_arg_bytes,
+                    TransactionArgument(
+                        [format_task_id(task_id) for task_id in task_ids],
+                        Serializer.sequence_serializer(U8_SEQUENCE_SERIALIZER),
+                    ).encode(),
+                    TransactionArgument(bid_prices, Serializer.sequence_serializer(Serializer.u64)).encode(),
+                    TransactionArgument(
+                        [self.reputation_score] * len(task_ids),
+                        Serializer.sequence_serializer(Serializer.u64),
+                    ).encode(),
+                ],
+            )
+            
+            signed_transaction = await self._client.create_bcs_signed_transaction(
+                self._account, TransactionPayload(payload)
+            )
+            txn_hash = await self._client.submit_bcs_transaction(signed_transaction)
+            log.info(f"  > 批量交易提交中... 哈希: {txn_hash}")
+            
+            tx_info = await wait_for_transaction_info(self._client, txn_hash)
+            log.info(f"  > ✅ 批量竞标成功! 交易版本: {tx_info['version']}")
+            return txn_hash
+            
+        except Exception as e:
+            log.warning(f"  > ❌ 批量竞标失败，改为逐个竞标: {e}")
+            return None
     
-    async def process_task_event(self, event: Dict) -> bool:
-        """处理单个任务事件"""
+    def _bid_price(self, max_budget: int) -> int:
+        """按竞标策略计算出价（预算的指定比例）"""
+        return max_budget * self.bid_price_ratio.numerator // self.bid_price_ratio.denominator
+    
+    async def process_task_event(self, event: Dict, sequence_number: Optional[int] = None) -> bool:
+        """处理单个任务事件（不保存状态，由调用方按事件顺序保存）"""
         try:
             current_seq_num = int(event["sequence_number"])
-            task_data = event["data"]
-            task_id = task_data["task_id"]
-            max_budget = int(task_data["max_budget"])
+            task_id = event["task_id"]
+            max_budget = int(event["max_budget"])
+            
+            log.info(f"[发现新任务] ID: {task_id}, 预算: {format_amount(max_budget)}, 序列号: {current_seq_num}")
             
-            print(f"\n[发现新任务] ID: {task_id}, 预算: {format_amount(max_budget)}, 序列号: {current_seq_num}")
+            if task_id in self.task_cache:
+                log.info(f"任务 {task_id} 已竞标过，跳过")
+                return True
             
             # 计算竞标价格（预算的指定比例）
-            bid_price = int(max_budget * self.bid_price_ratio)
+            bid_price = self._bid_price(max_budget)
             
             # 提交竞标
-            success = await self.place_bid(task_id, bid_price, self.reputation_score)
+            async with self._bid_semaphore:
+                bid_hash = await self.place_bid(task_id, bid_price, self.reputation_score, sequence_number)
             
-            if success:
-                # 成功竞标后保存状态
-                self.save_state(current_seq_num)
+            if bid_hash:
+                # 成功竞标后记录任务
+                self.task_cache.add(task_id, max_budget, int(event["deadline"]), bid_hash)
                 return True
             else:
-                print(f"处理任务 {task_id} 失败，跳过状态更新")
+                log.warning(f"处理任务 {task_id} 失败，跳过状态更新")
                 return False
                 
         except Exception as e:
-            print(f"处理事件失败: {e}")
+            log.error(f"处理事件失败: {e}")
+            return False
+    
+    async def process_task_events(self, events: List[Dict]) -> List[bool]:
+        """
+        并发处理一批任务事件。
+        
+        只查询一次链上序列号，为需要竞标的事件依次分配序列号，
+        然后同时提交并等待所有竞标交易，返回与 events 一一对应的处理结果。
+        """
+        # 同一批次中重复的 task_id 只竞标一次，重复事件沿用首个事件的处理结果
+        first_events = {}
+        for event in events:
+            first_events.setdefault(event["task_id"], event)
+        unique_events = list(first_events.values())
+        
+        new_events = [event for event in unique_events if event["task_id"] not in self.task_cache]
+        
+        # 批量竞标成功后这些任务已在缓存中，下面逐个处理时会直接跳过；
+        # 批量交易是原子的，失败时逐个竞标，单个过期任务不会拖累其他任务
+        if self.batch_bids and len(new_events) > 1:
+            batch_hash = await self.place_bids_batch(new_events)
+            if batch_hash:
+                for event in new_events:
+                    self.task_cache.add(event["task_id"], int(event["max_budget"]), int(event["deadline"]), batch_hash)
+                new_events = []
+        
+        sequence_numbers = {}
+        if new_events:
+            base_sequence_number = await self._client.account_sequence_number(self._account.address())
+            sequence_numbers = {id(event): base_sequence_number + i for i, event in enumerate(new_events)}
+        
+        unique_results = await asyncio.gather(
+            *(self.process_task_event(event, sequence_numbers.get(id(event))) for event in unique_events)
+        )
+        await asyncio.to_thread(self.task_cache.save)
+        
+        results_by_task = {event["task_id"]: result for event, result in zip(unique_events, unique_results)}
+        return [results_by_task[event["task_id"]] for event in events]
+    
+    async def _sleep_or_stop(self, seconds: float) -> bool:
+        """等待指定秒数，期间收到停止信号立即返回 True，正常超时返回 False"""
+        try:
+            async with async_timeout(seconds):
+                await self.shutdown_event.wait()
+            return True
+        except asyncio.TimeoutError:
             return False
     
     async def monitor_tasks(self):
         """主监控循环"""
         last_seq_num = self.load_state()
-        print(f"\n🚀 Service Agent 监控器启动，从序列号 {last_seq_num} 开始监控...")
-        print("正在监控新任务", end="")
+        log.info(f"🚀 Service Agent 监控器启动，从序列号 {last_seq_num} 开始监控...")
         
         try:
-            while not shutdown_event.is_set():
+            while not self.shutdown_event.is_set():
                 try:
                     # 查询新事件
-                    events = self.query_indexer_for_new_tasks(last_seq_num)
+                    events = await self.query_indexer_for_new_tasks(last_seq_num)
+                    # 丢弃序列号不大于当前进度的事件（Indexer 返回重叠范围时不重复处理）
+                    events = [event for event in events if int(event["sequence_number"]) > last_seq_num]
                     
                     if not events:
-                        print(".", end="", flush=True)
-                        # 使用 wait_for 来响应停止信号
-                        try:
-                            await asyncio.wait_for(asyncio.sleep(self.poll_interval), timeout=1.0)
-                        except asyncio.TimeoutError:
-                            continue
+                        log.debug("没有新任务，%.1f秒后再次轮询", self._current_interval)
+                        # 空闲时写入尚未保存的进度
+                        if self._unsaved_events:
+                            await asyncio.to_thread(self.save_state, last_seq_num)
+                        if await self._sleep_or_stop(self._current_interval):
+                            break
+                        self._current_interval = min(self._current_interval * POLL_BACKOFF_FACTOR, self.max_interval)
                         continue
                     
-                    # 处理每个事件
-                    for event in events:
-                        # 检查是否需要停止
-                        if shutdown_event.is_set():
-                            print(f"\n收到停止信号，保存当前状态...")
-                            self.save_state(last_seq_num)
-                            return
-                            
-                        success = await self.process_task_event(event)
-                        if success:
-                            last_seq_num = int(event["sequence_number"])
-                        else:
-                            # 如果处理失败，不更新序列号，下次重试
+                    # 检查是否需要停止
+                    if self.shutdown_event.is_set():
+                        log.info("收到停止信号，保存当前状态...")
+                        self.save_state(last_seq_num)
+                        return
+                    
+                    # 并发处理本批事件
+                    results = await self.process_task_events(events)
+                    
+                    # 只推进到第一个失败事件之前，失败的事件及其后的事件下次重试
+                    # （已成功竞标的任务在缓存中，重试时会被跳过）
+                    for event, success in zip(events, results):
+                        if not success:
+                            log.warning(f"处理序列号 {event['sequence_number']} 的事件失败，下次重试")
                             break
+                        last_seq_num = int(event["sequence_number"])
+                        self._unsaved_events += 1
                     
-                    # 短暂休息后继续监控
-                    try:
-                        await asyncio.wait_for(asyncio.sleep(2), timeout=1.0)
-                    except asyncio.TimeoutError:
-                        continue
+                    # 批量保存状态，在线程中写文件不阻塞事件循环；重放的事件会被已竞标任务缓存跳过
+                    if self._unsaved_events >= self.save_every or (
+                        self._unsaved_events and time.monotonic() - self._last_flush >= STATE_FLUSH_INTERVAL
+                    ):
+                        await asyncio.to_thread(self.save_state, last_seq_num)
+                    
+                    # 有新任务时任务往往成批出现，按最小间隔继续监控
+                    self._current_interval = self.min_interval
+                    if await self._sleep_or_stop(self._current_interval):
+                        break
                         
                 except Exception as e:
-                    print(f"\n监控循环发生错误: {e}")
-                    print("等待10秒后重试...")
-                    try:
-                        await asyncio.wait_for(asyncio.sleep(10), timeout=1.0)
-                    except asyncio.TimeoutError:
-                        continue
+                    log.error(f"监控循环发生错误: {e}")
+                    log.info("等待10秒后重试...")
+                    if await self._sleep_or_stop(10):
+                        break
                         
         finally:
             # 确保最终状态被保存
-            print(f"\n正在保存最终状态...")
+            log.info("正在保存最终状态...")
             self.save_state(last_seq_num)
-            print("监控服务已优雅停止")
+            log.info("监控服务已优雅停止")
 
 
 async def main():
     """主函数"""
-    # 注册信号处理器
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # 先加载 .env，使 LOG_LEVEL 在创建监控器前生效
+    load_env()
+    log_listener = _start_log_listener(os.getenv("LOG_LEVEL", "INFO"))
     
-    monitor = ServiceAgentMonitor()
+    # 停止事件
+    shutdown_event = asyncio.Event()
+    
+    # 注册信号处理器：由事件循环在自身线程中调用，安全地设置停止事件
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_shutdown, sig, shutdown_event)
+        except NotImplementedError:
+            # Windows 的事件循环不支持 add_signal_handler，转交给事件循环线程处理
+            signal.signal(
+                sig, lambda signum, frame: loop.call_soon_threadsafe(request_shutdown, signum, shutdown_event)
+            )
     
     try:
-        await monitor.monitor_tasks()
+        async with ServiceAgentMonitor(shutdown_event) as monitor:
+            await monitor.monitor_tasks()
     except Exception as e:
-        print(f"服务运行失败: {e}")
+        log.error(f"服务运行失败: {e}")
         sys.exit(1)
     finally:
-        print("服务已完全停止")
+        log.info("服务已完全停止")
+        log_listener.stop()
 
 
 if __name__ == "__main__":
+    try:
+        # uvloop 的事件循环在套接字和定时器处理上更快，未安装时使用标准库事件循环
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,34 @@
+/// End-to-end task flow in a single transaction
+///
+/// Runs publish -> bid -> select winner -> complete atomically. The transaction is
+/// multi-agent: the creator (Personal Agent) is the sender and the Service Agent is
+/// the secondary signer, since place_bid and complete_task must be signed by the
+/// winning bidder and the contract forbids creators from bidding on their own tasks.
+script {
+    use std::string;
+    use aptos_task_manager::bidding_system;
+
+    fun e2e_task(
+        creator: &signer,
+        service_agent: &signer,
+        platform_addr: address,
+        task_id: vector<u8>,
+        description: vector<u8>,
+        max_budget: u64,
+        deadline_seconds: u64,
+        bid_price: u64,
+        reputation_score: u64,
+    ) {
+        bidding_system::publish_task(
+            creator,
+            platform_addr,
+            copy task_id,
+            string::utf8(description),
+            max_budget,
+            deadline_seconds,
+        );
+        bidding_system::place_bid(service_agent, platform_addr, copy task_id, bid_price, reputation_score);
+        bidding_system::select_winner(creator, platform_addr, copy task_id);
+        bidding_system::complete_task(service_agent, platform_addr, task_id);
+    }
+}
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Aptos Bidding System - 命令分发脚本
+在同一进程中执行多条竞标/完成/取消命令，共享一个 REST 客户端
+"""
+
+import argparse
+import shlex
+import sys
+from typing import List
+from common_bidding import (
+    get_shared_client,
+    get_platform_address,
+    load_account_from_profile,
+    get_shared_sequence_cache,
+    run_script,
+    DEFAULT_PROFILE
+)
+from place_bid import (
+    place_bid_with_client,
+    place_bids_batch_with_client,
+    place_bids_in_one_transaction_with_client,
+)
+from cancel_task import cancel_task_with_client
+from complete_task import complete_task_with_client
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行解析器，命令文件中的每一行也用它解析"""
+    parser = argparse.ArgumentParser(description="在同一进程中执行多条竞标平台命令")
+    parser.add_argument(
+        "--commands-file",
+        help="从文件读取多条子命令 (每行一条，- 表示标准输入)，按顺序执行并复用同一连接"
+    )
+    parser.add_argument(
+        "--single-transaction",
+        action="store_true",
+        help="相邻的同一账户 bid 命令合并为一笔 place_bids_batch 交易 (原子执行，任一竞标失败则全部不生效)"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="可用的子命令")
+    
+    p_bid = subparsers.add_parser("bid", help="对任务进行竞标")
+    p_bid.add_argument("task_id", type=str, help="任务的唯一ID")
+    p_bid.add_argument("bid_price", type=int, help="竞标价格 (Octas)")
+    p_bid.add_argument("reputation_score", type=int, help="声誉评分 (0-100)")
+    
+    p_cancel = subparsers.add_parser("cancel", help="取消任务并获得全额退款")
+    p_cancel.add_argument("task_id", type=str, help="任务的唯一ID")
+    
+    p_complete = subparsers.add_parser("complete", help="完成任务并获得付款")
+    p_complete.add_argument("task_id", type=str, help="任务的唯一ID")
+    
+    for subparser in (p_bid, p_cancel, p_complete):
+        subparser.add_argument(
+            "--profile",
+            default=DEFAULT_PROFILE,
+            help=f"指定 Aptos CLI 配置文件 (默认: {DEFAULT_PROFILE})"
+        )
+        subparser.add_argument(
+            "--platform",
+            help="平台地址 (默认从profile获取)"
+        )
+    
+    return parser
+
+
+def validate_command(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """与单独脚本相同的参数校验，出错时退出"""
+    if len(args.task_id.strip()) == 0:
+        parser.error("任务ID不能为空")
+    if args.command == "bid":
+        if args.bid_price <= 0:
+            parser.error("竞标价格必须大于0")
+        if args.reputation_score < 0 or args.reputation_score > 100:
+            parser.error("声誉评分必须在0-100之间")
+
+
+def read_commands(parser: argparse.ArgumentParser, path: str) -> List[argparse.Namespace]:
+    """读取命令文件，每行一条子命令（忽略空行和 # 注释），先全部解析再执行"""
+    commands = []
+    f = sys.stdin if path == "-" else open(path, "r")
+    try:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            command_args = parser.parse_args(shlex.split(line))
+            if command_args.command is None:
+                parser.error(f"命令文件中的行缺少子命令: {line}")
+            commands.append(command_args)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return commands
+
+
+def group_commands(commands: List[argparse.Namespace]) -> List[List[argparse.Namespace]]:
+    """把相邻且使用相同 profile 和平台的 bid 命令合为一组，其他命令各自一组"""
+    groups = []
+    for args in commands:
+        previous = groups[-1][-1] if groups else None
+        if (
+            args.command == "bid"
+            and previous is not None
+            and previous.command == "bid"
+            and (previous.profile, previous.platform) == (args.profile, args.platform)
+        ):
+            groups[-1].append(args)
+        else:
+            groups.append([args])
+    return groups
+
+
+def resolve_platform_address(args: argparse.Namespace) -> str:
+    """
+    按各独立脚本的规则确定平台地址：cancel 与 cancel_task.py 一样使用 --profile 的账户地址，
+    bid 和 complete 与 place_bid.py、complete_task.py 一样使用默认 profile 的账户地址。
+    """
+    if args.platform:
+        return args.platform
+    profile = args.profile if args.command == "cancel" else DEFAULT_PROFILE
+    return get_platform_address(profile)
+
+
+async def run(commands: List[argparse.Namespace], single_transaction: bool = False) -> bool:
+    """
+    依次执行所有命令，全部命令共用一个 REST 客户端。
+    
+    按顺序执行而不是并发：同一账户的交易需要依次使用序列号，
+    且命令之间可能有先后依赖（例如先竞标后取消）。
+    相邻的同一账户 bid 命令按连续序列号一起签名并并发提交，
+    single_transaction 为 True 时改为合并成一笔 place_bids_batch 交易。
+    每个账户的序列号只查询一次，之后在本地递增。
+    """
+    client = await get_shared_client()
+    sequence_cache = await get_shared_sequence_cache()
+    all_succeeded = True
+    for group in group_commands(commands):
+        args = group[0]
+        platform_addr = resolve_platform_address(args)
+        account = load_account_from_profile(args.profile)
+        
+        if len(group) > 1 and single_transaction:
+            success = await place_bids_in_one_transaction_with_client(
+                client, account, platform_addr,
+                [(bid.task_id, bid.bid_price, bid.reputation_score) for bid in group],
+                sequence_cache,
+            )
+        elif len(group) > 1:
+            results = await place_bids_batch_with_client(
+                client, account, platform_addr,
+                [(bid.task_id, bid.bid_price, bid.reputation_score) for bid in group],
+                sequence_cache,
+            )
+            success = all(results)
+        elif args.command == "bid":
+            success = await place_bid_with_client(
+                client, account, platform_addr, args.task_id, args.bid_price, args.reputation_score,
+                sequence_cache=sequence_cache,
+            )
+        elif args.command == "cancel":
+            success = await cancel_task_with_client(client, account, platform_addr, args.task_id, sequence_cache)
+        else:
+            success = await complete_task_with_client(client, account, platform_addr, args.task_id, sequence_cache)
+        
+        all_succeeded = all_succeeded and success
+        print("")
+    
+    return all_succeeded
+
+
+async def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    
+    if args.commands_file:
+        commands = read_commands(parser, args.commands_file)
+    elif args.command:
+        commands = [args]
+    else:
+        parser.error("请指定子命令或 --commands-file")
+    
+    for command_args in commands:
+        validate_command(parser, command_args)
+    
+    success = await run(commands, args.single_transaction)
+    
+    if success:
+        print(f"全部 {len(commands)} 条命令执行完成!")
+    else:
+        print("部分命令执行失败!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_script(main)
@@ -5,8 +5,22 @@ Aptos Bidding System - 通用模块
 
 import yaml
 import os
-from aptos_sdk.async_client import RestClient, ClientConfig
+import time
+import asyncio
+import functools
+from typing import List, NamedTuple, Optional, Tuple
+import httpx
+from aptos_sdk.async_client import RestClient, ClientConfig, ApiError
 from aptos_sdk.account import Account
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.bcs import Serializer
+from aptos_sdk.transactions import EntryFunction, ModuleId, TransactionArgument, TransactionPayload
+
+try:
+    # orjson 解析 view 函数返回的 JSON 更快，未安装时回退到标准库
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # --- 配置 ---
 
@@ -14,8 +28,28 @@ from aptos_sdk.account import Account
 NODE_URL = "https://api.devnet.aptoslabs.com/v1"
 FAUCET_URL = "https://faucet.devnet.aptoslabs.com"
 
-# API Key for rate limiting
-API_KEY = "aptoslabs_ZYXEWFj9U8Y_KzPc9M8Z7N42zdvZKuRWwLMARnskLzTTh"
+# API Key for rate limiting（从环境变量 APTOS_API_KEY 读取，不在源码中保存）
+API_KEY = os.getenv("APTOS_API_KEY")
+
+# 所有 RestClient 共用的客户端配置，模块加载时创建一次
+CLIENT_CONFIG = ClientConfig(api_key=API_KEY)
+
+# REST 客户端连接池配置：批量提交和确认查询在 HTTP/2 连接上多路复用
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# 进程内共享的 RestClient（按节点 URL），见 get_shared_client
+SHARED_CLIENTS = {}
+
+# 进程内共享的序列号缓存（按节点 URL），见 get_shared_sequence_cache
+SHARED_SEQUENCE_CACHES = {}
+
+# vector<u8> 参数的序列化器，所有交易参数共用同一个实例
+U8_SEQUENCE_SERIALIZER = Serializer.sequence_serializer(Serializer.u8)
+
+# 批量交易的 vector 参数序列化器（vector<vector<u8>>、vector<String>、vector<u64>），同样只创建一次
+U8_SEQUENCE_SEQUENCE_SERIALIZER = Serializer.sequence_serializer(U8_SEQUENCE_SERIALIZER)
+STR_SEQUENCE_SERIALIZER = Serializer.sequence_serializer(Serializer.str)
+U64_SEQUENCE_SERIALIZER = Serializer.sequence_serializer(Serializer.u64)
 
 # 默认的配置文件路径
 DEFAULT_PROFILE = "task_manager_dev"
@@ -23,6 +57,9 @@ DEFAULT_PROFILE = "task_manager_dev"
 # bidding_system 模块名称
 BIDDING_MODULE = "bidding_system"
 
+# bidding_system 合约中 ETASK_NOT_FOUND 的中止码（get_task 找不到任务时中止）
+TASK_NOT_FOUND_ABORT_CODE = 102
+
 # 任务状态常量
 STATUS_PUBLISHED = 1
 STATUS_ASSIGNED = 2
@@ -37,10 +74,25 @@ STATUS_NAMES = {
     STATUS_CANCELLED: "CANCELLED"
 }
 
+# PyYAML 编译了 libyaml 时使用 C 实现的加载器，否则回退到纯 Python 实现
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# 等待交易确认时的轮询间隔（秒）：从较短间隔开始，按倍数退避到上限
+TRANSACTION_POLL_INITIAL = 0.1
+TRANSACTION_POLL_FACTOR = 2
+TRANSACTION_POLL_MAX = 1.0
+
+# 批量等待确认时每次查询账户交易列表的最大条数（节点 API 的分页上限）
+ACCOUNT_TRANSACTIONS_PAGE_LIMIT = 100
+
+# 不支持 wait_by_hash 长轮询接口的节点 URL（旧版本节点），对这些节点直接使用 by_hash 轮询
+LONG_POLL_UNSUPPORTED_NODES = set()
+
 # --- 核心函数 ---
 
+@functools.lru_cache(maxsize=8)
 def load_account_from_profile(profile: str) -> Account:
-    """从 .aptos/config.yaml 中加载指定profile的账户"""
+    """从 .aptos/config.yaml 中加载指定profile的账户（运行期间配置不变，按 profile 缓存）"""
     
     # 优先使用项目本地的配置文件，然后是全局配置文件
     # 查找项目根目录的 .aptos 配置
@@ -52,14 +104,10 @@ def load_account_from_profile(profile: str) -> Account:
     current_config_path = os.path.join(".aptos", "config.yaml")
     global_config_path = os.path.expanduser("~/.aptos/config.yaml")
     
-    config_path = ""
-
-    if os.path.exists(local_config_path):
-        config_path = local_config_path
-    elif os.path.exists(current_config_path):
-        config_path = current_config_path
-    elif os.path.exists(global_config_path):
-        config_path = global_config_path
+    # 按优先级依次查找，找到第一个存在的配置文件即停止
+    for config_path in (local_config_path, current_config_path, global_config_path):
+        if os.path.exists(config_path):
+            break
     else:
         raise FileNotFoundError(
             f"Aptos config file not found in:\n"
@@ -70,7 +118,7 @@ def load_account_from_profile(profile: str) -> Account:
         )
 
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YAML_LOADER)
 
     if "profiles" not in config or profile not in config["profiles"]:
         raise ValueError(f"Profile '{profile}' not found in aptos config file.")
@@ -82,25 +130,325 @@ def load_account_from_profile(profile: str) -> Account:
     return Account.load_key(private_key)
 
 
+async def create_client(node_url: str = NODE_URL) -> RestClient:
+    """
+    创建使用共享配置（含API key）的RestClient实例。
+    
+    SDK 默认的 httpx 连接池较小，这里换成启用 HTTP/2 的更大连接池，
+    批量竞标时的多个提交和确认请求复用同一条连接。
+    """
+    client = RestClient(node_url, CLIENT_CONFIG)
+    default_client = client.client
+    client.client = httpx.AsyncClient(
+        http2=CLIENT_CONFIG.http2,
+        limits=HTTP_LIMITS,
+        timeout=default_client.timeout,
+        headers=default_client.headers,
+    )
+    await default_client.aclose()
+    return client
+
+
+async def get_shared_client(node_url: str = NODE_URL) -> RestClient:
+    """
+    返回进程内共享的 RestClient，按节点 URL 首次使用时创建。
+    
+    同一进程中的所有操作复用同一个连接池，只在首次请求时建立一次 TCP+TLS 连接；
+    由 run_script 在脚本结束时统一关闭。
+    """
+    client = SHARED_CLIENTS.get(node_url)
+    if client is None:
+        created = await create_client(node_url)
+        # 并发的首次调用只保留先登记的客户端，多创建的立即关闭
+        client = SHARED_CLIENTS.setdefault(node_url, created)
+        if client is not created:
+            await created.close()
+    return client
+
+
+async def close_shared_clients():
+    """关闭所有共享的 RestClient"""
+    SHARED_SEQUENCE_CACHES.clear()
+    while SHARED_CLIENTS:
+        _, client = SHARED_CLIENTS.popitem()
+        await client.close()
+
+
 async def get_client_and_account(profile: str = DEFAULT_PROFILE) -> tuple[RestClient, Account]:
     """
-    创建一个Aptos REST客户端并从指定的配置文件加载账户。
+    返回进程内共享的Aptos REST客户端，并从指定的配置文件加载账户。
+    
+    调用方不需要关闭客户端，连接在 run_script 结束时统一关闭。
     
     返回:
         一个元组 (RestClient, Account)
     """
-    # 创建带有API key的ClientConfig
-    client_config = ClientConfig(api_key=API_KEY)
-    
-    # 创建RestClient实例
-    client = RestClient(NODE_URL, client_config)
-    
+    client = await get_shared_client()
     account = load_account_from_profile(profile)
     return client, account
 
 
+async def wait_for_transaction_info(client: RestClient, txn_hash: str) -> dict:
+    """
+    等待交易确认并直接返回已确认的交易信息。
+    
+    替代 SDK 的 wait_for_transaction + transaction_by_hash：
+    SDK 固定每秒轮询一次，这里从 0.1 秒开始按倍数退避到 1 秒，
+    交易很快上链时能更早拿到结果，确认后也不再额外请求一次交易详情。
+    节点支持 wait_by_hash 长轮询时由节点侧等待，不再在客户端休眠。
+    """
+    deadline = time.monotonic() + client.client_config.transaction_wait_in_seconds
+    poll_interval = TRANSACTION_POLL_INITIAL
+    while True:
+        tx_info, long_polled = await fetch_transaction(client, txn_hash)
+        
+        if tx_info is not None and tx_info.get("type") != "pending_transaction":
+            if not tx_info.get("success"):
+                raise Exception(f"交易执行失败: {tx_info.get('vm_status')} - {txn_hash}")
+            return tx_info
+        
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"交易 {txn_hash} 等待确认超时")
+        # 节点已经在服务端等待过时立即发起下一次长轮询，否则按退避间隔休眠
+        if not long_polled:
+            await asyncio.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+            poll_interval = min(poll_interval * TRANSACTION_POLL_FACTOR, TRANSACTION_POLL_MAX)
+
+
+async def fetch_transaction(client: RestClient, txn_hash: str) -> tuple[Optional[dict], bool]:
+    """
+    查询交易，返回 (交易信息, 是否由节点长轮询返回)；交易尚未被节点索引时交易信息为 None。
+    
+    优先使用节点的 transactions/wait_by_hash 接口：交易在内存池中时节点保持请求，
+    上链后立即返回，不必在客户端按固定间隔轮询。节点不支持该接口时退回 by_hash 查询。
+    """
+    if client.base_url not in LONG_POLL_UNSUPPORTED_NODES:
+        response = await client._get(endpoint=f"transactions/wait_by_hash/{txn_hash}")
+        if response.status_code < 400:
+            tx_info = response.json()
+            return tx_info, tx_info.get("type") == "pending_transaction"
+        if response.status_code != 404:
+            raise ApiError(response.text, response.status_code)
+        try:
+            error_code = response.json().get("error_code")
+        except ValueError:
+            error_code = None
+        # 404 表示交易尚未被节点索引，继续等待
+        if error_code == "transaction_not_found":
+            return None, False
+        # 其他 404 说明节点没有该接口，之后对这个节点只使用 by_hash 查询
+        LONG_POLL_UNSUPPORTED_NODES.add(client.base_url)
+    
+    try:
+        return await client.transaction_by_hash(txn_hash), False
+    except ApiError as e:
+        # 404 表示交易尚未被节点索引，继续等待
+        if e.status_code != 404:
+            raise
+        return None, False
+
+
+class SequenceNumberCache:
+    """
+    按账户缓存下一个可用的序列号。
+    
+    首次使用某账户时查询一次链上序列号，之后在本地递增，
+    同一进程中连续提交多笔交易时不必每次都请求节点。
+    提交失败时调用 invalidate，下次使用前重新同步。
+    """
+    
+    def __init__(self, client: RestClient):
+        self._client = client
+        self._next_sequence_numbers = {}
+        self._lock = asyncio.Lock()
+    
+    async def reserve(self, account: Account, count: int = 1) -> int:
+        """为账户预留 count 个连续序列号，返回第一个"""
+        address = account.address()
+        key = str(address)
+        async with self._lock:
+            if key not in self._next_sequence_numbers:
+                self._next_sequence_numbers[key] = await self._client.account_sequence_number(address)
+            sequence_number = self._next_sequence_numbers[key]
+            self._next_sequence_numbers[key] = sequence_number + count
+            return sequence_number
+    
+    def invalidate(self, account: Account):
+        """丢弃账户的本地序列号，下次预留时重新从链上查询"""
+        self._next_sequence_numbers.pop(str(account.address()), None)
+
+
+async def get_shared_sequence_cache(node_url: str = NODE_URL) -> SequenceNumberCache:
+    """返回进程内共享的序列号缓存，同一进程中的所有交易共用一份本地序列号"""
+    sequence_cache = SHARED_SEQUENCE_CACHES.get(node_url)
+    if sequence_cache is None:
+        sequence_cache = SHARED_SEQUENCE_CACHES.setdefault(
+            node_url, SequenceNumberCache(await get_shared_client(node_url))
+        )
+    return sequence_cache
+
+
+def is_task_not_found_error(e: Exception) -> bool:
+    """view 调用是否因任务不存在（get_task 中的 ETASK_NOT_FOUND）而失败"""
+    if not isinstance(e, ApiError):
+        return False
+    message = str(e)
+    # 节点有合约错误表时显示常量名，否则只显示十六进制的中止码
+    return "ETASK_NOT_FOUND" in message or f"::{BIDDING_MODULE}: {hex(TASK_NOT_FOUND_ABORT_CODE)}" in message
+
+
+def is_sequence_number_error(e: Exception) -> bool:
+    """交易是否因序列号过旧或过新被节点拒绝"""
+    message = str(e)
+    return "SEQUENCE_NUMBER_TOO_OLD" in message or "SEQUENCE_NUMBER_TOO_NEW" in message
+
+
+async def submit_transaction(
+    client: RestClient,
+    account: Account,
+    payload: TransactionPayload,
+    sequence_cache: Optional[SequenceNumberCache] = None,
+) -> str:
+    """
+    签名并提交交易，返回交易哈希。
+    
+    使用本地递增的序列号（未提供 sequence_cache 时使用进程内共享的缓存），
+    不必每笔交易都向节点查询序列号；提交失败时让缓存重新同步，
+    若因序列号被拒绝则用同步后的序列号重试一次。
+    """
+    if sequence_cache is None:
+        sequence_cache = await get_shared_sequence_cache()
+    
+    for attempt in range(2):
+        # 首次使用客户端时序列号和链 ID 都需要查询，两个请求同时发出，只等待一次往返
+        sequence_number, _ = await asyncio.gather(sequence_cache.reserve(account), client.chain_id())
+        signed_transaction = await client.create_bcs_signed_transaction(
+            account, payload, sequence_number=sequence_number
+        )
+        try:
+            return await client.submit_bcs_transaction(signed_transaction)
+        except Exception as e:
+            # 预留的序列号没有被使用，本地计数已不可信
+            sequence_cache.invalidate(account)
+            if attempt > 0 or not is_sequence_number_error(e):
+                raise
+
+
+class SubmittedTransactions(NamedTuple):
+    """submit_transactions 的结果：发送者地址、起始序列号，以及与 payloads 一一对应的交易哈希（提交失败的位置为异常对象）"""
+    sender: AccountAddress
+    start_sequence_number: int
+    txn_hashes: list
+
+
+async def submit_transactions(
+    client: RestClient,
+    account: Account,
+    payloads: List[TransactionPayload],
+    sequence_cache: Optional[SequenceNumberCache] = None,
+) -> SubmittedTransactions:
+    """
+    按连续序列号签名多笔交易并并发提交，不等待确认。
+    
+    序列号从缓存中一次预留（未提供 sequence_cache 时使用进程内共享的缓存）。
+    """
+    if sequence_cache is None:
+        sequence_cache = await get_shared_sequence_cache()
+    # 预留序列号的同时取得链 ID（客户端会缓存），避免并发签名时每笔交易各自请求一次节点信息
+    base_sequence_number, _ = await asyncio.gather(
+        sequence_cache.reserve(account, len(payloads)), client.chain_id()
+    )
+    signed_transactions = await asyncio.gather(*(
+        client.create_bcs_signed_transaction(account, payload, sequence_number=base_sequence_number + i)
+        for i, payload in enumerate(payloads)
+    ))
+    
+    # 按序列号顺序并发提交，节点会按序列号依次执行同一账户的交易
+    txn_hashes = await asyncio.gather(
+        *(client.submit_bcs_transaction(signed_transaction) for signed_transaction in signed_transactions),
+        return_exceptions=True,
+    )
+    if any(isinstance(txn_hash, Exception) for txn_hash in txn_hashes):
+        # 有交易未被接受时预留的序列号出现空洞，下次使用前重新同步
+        sequence_cache.invalidate(account)
+    return SubmittedTransactions(account.address(), base_sequence_number, list(txn_hashes))
+
+
+async def wait_for_transactions(client: RestClient, submitted: SubmittedTransactions) -> list:
+    """
+    用一个轮询循环等待 submit_transactions 提交的所有交易确认，
+    返回与交易哈希一一对应的交易信息，失败的位置为异常对象。
+    
+    这批交易来自同一账户且序列号连续，每轮只请求一次账户交易列表
+    (accounts/{address}/transactions) 并按哈希匹配已上链的交易，
+    请求数不随交易数量增长，而不是为每笔交易各自轮询 by_hash。
+    """
+    results = list(submitted.txn_hashes)
+    # 交易哈希 -> 在批次中的位置，提交失败的交易不需要等待
+    pending = {txn_hash: i for i, txn_hash in enumerate(results) if not isinstance(txn_hash, Exception)}
+    deadline = time.monotonic() + client.client_config.transaction_wait_in_seconds
+    poll_interval = TRANSACTION_POLL_INITIAL
+    
+    while pending:
+        # 只查询尚未确认的序列号区间
+        first = min(pending.values())
+        last = max(pending.values())
+        response = await client._get(
+            endpoint=f"accounts/{submitted.sender}/transactions",
+            params={
+                "start": submitted.start_sequence_number + first,
+                "limit": min(last - first + 1, ACCOUNT_TRANSACTIONS_PAGE_LIMIT),
+            },
+        )
+        if response.status_code >= 400:
+            raise ApiError(response.text, response.status_code)
+        
+        for tx_info in response.json():
+            i = pending.pop(tx_info.get("hash"), None)
+            if i is None:
+                continue
+            if tx_info.get("success"):
+                results[i] = tx_info
+            else:
+                results[i] = Exception(f"交易执行失败: {tx_info.get('vm_status')} - {tx_info.get('hash')}")
+        
+        if not pending:
+            break
+        if time.monotonic() >= deadline:
+            for txn_hash, i in pending.items():
+                results[i] = TimeoutError(f"交易 {txn_hash} 等待确认超时")
+            break
+        await asyncio.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+        poll_interval = min(poll_interval * TRANSACTION_POLL_FACTOR, TRANSACTION_POLL_MAX)
+    
+    return results
+
+
+def install_uvloop():
+    """安装 uvloop 事件循环（套接字和定时器处理更快），未安装 uvloop 时使用标准库事件循环"""
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+
+def run_script(main):
+    """运行脚本入口协程：先安装 uvloop，结束时关闭共享的 RestClient"""
+    install_uvloop()
+    
+    async def run_and_close():
+        try:
+            return await main()
+        finally:
+            await close_shared_clients()
+    
+    return asyncio.run(run_and_close())
+
+
+@functools.lru_cache(maxsize=8)
 def get_platform_address(profile: str = DEFAULT_PROFILE) -> str:
-    """获取平台地址（从配置文件中获取账户地址）"""
+    """获取平台地址（从配置文件中获取账户地址，运行期间不变，按 profile 缓存）"""
     account = load_account_from_profile(profile)
     return str(account.address())
 
@@ -110,11 +458,55 @@ def get_function_id(platform_addr: str, function_name: str) -> str:
     return f"{platform_addr}::{BIDDING_MODULE}::{function_name}"
 
 
+async def call_view(client: RestClient, platform_addr: str, function_name: str, arguments: list) -> list:
+    """调用 bidding_system 的 view 函数并解析返回的 JSON（SDK 的 view 只返回原始响应字节），结果为返回值列表"""
+    content = await client.view(get_function_id(platform_addr, function_name), [], arguments)
+    return json_loads(content)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_address(address: str) -> AccountAddress:
+    """解析十六进制地址字符串（同一地址在批量交易中反复使用，按字符串缓存）"""
+    return AccountAddress.from_str(address)
+
+
+@functools.lru_cache(maxsize=1024)
 def format_task_id(task_id: str) -> bytes:
     """将字符串任务ID转换为字节数组"""
     return task_id.encode('utf-8')
 
 
+@functools.lru_cache(maxsize=16)
+def platform_payload_template(platform_addr: str) -> Tuple[ModuleId, bytes]:
+    """同一平台的交易共用的 bidding_system 模块ID和已完成 BCS 编码的平台地址参数"""
+    address = parse_address(platform_addr)
+    return ModuleId(address, BIDDING_MODULE), TransactionArgument(address, Serializer.struct).encode()
+
+
+@functools.lru_cache(maxsize=1024)
+def encode_task_id_arg(task_id: str) -> bytes:
+    """已完成 BCS 编码的 vector<u8> 任务ID参数（同一任务在批量和重试中反复使用，按任务ID缓存）"""
+    return TransactionArgument(format_task_id(task_id), U8_SEQUENCE_SERIALIZER).encode()
+
+
+def build_task_payload(platform_addr: str, function_name: str, task_id: str) -> TransactionPayload:
+    """构建只接收平台地址和任务ID的交易Payload（select_winner、cancel_task、complete_task）"""
+    module, platform_arg_bytes = platform_payload_template(platform_addr)
+    payload = EntryFunction(
+        module,
+        function_name,
+        [], # 无类型参数
+        [platform_arg_bytes, encode_task_id_arg(task_id)],
+    )
+    return TransactionPayload(payload)
+
+
+@functools.lru_cache(maxsize=4096)
+def task_id_hex(task_id: str) -> str:
+    """将字符串任务ID转换为 view 函数参数使用的 0x 前缀十六进制字符串（轮询同一任务时复用结果）"""
+    return "0x" + format_task_id(task_id).hex()
+
+
 def format_status(status: int) -> str:
     """格式化状态显示"""
     return STATUS_NAMES.get(status, f"UNKNOWN({status})")
@@ -5,18 +5,18 @@ Service Agent 完成任务并获得付款
 """
 
 import argparse
-import asyncio
-from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
-from aptos_sdk.transactions import (
-    EntryFunction,
-    TransactionPayload,
-    TransactionArgument,
-)
+from typing import Optional
+from aptos_sdk.account import Account
+from aptos_sdk.async_client import RestClient
 from common_bidding import (
-    get_client_and_account, 
+    get_shared_client,
+    load_account_from_profile,
     get_platform_address,
-    format_task_id,
+    submit_transaction,
+    wait_for_transaction_info,
+    SequenceNumberCache,
+    run_script,
+    build_task_payload,
     DEFAULT_PROFILE
 )
 
@@ -25,10 +25,24 @@ async def complete_task(
     profile: str,
     platform_addr: str,
     task_id: str,
+    client: Optional[RestClient] = None,
 ):
-    """完成任务并获得付款"""
+    """完成任务并获得付款（未传入 client 时使用进程内共享的客户端）"""
     
-    client, winner_account = await get_client_and_account(profile)
+    if client is None:
+        client = await get_shared_client()
+    winner_account = load_account_from_profile(profile)
+    return await complete_task_with_client(client, winner_account, platform_addr, task_id)
+
+
+async def complete_task_with_client(
+    client: RestClient,
+    winner_account: Account,
+    platform_addr: str,
+    task_id: str,
+    sequence_cache: Optional[SequenceNumberCache] = None,
+) -> bool:
+    """完成任务并获得付款（使用调用方的客户端且不关闭，cli.py 在多条命令间复用连接）"""
     winner_addr = str(winner_account.address())
     
     print("=" * 50)
@@ -40,32 +54,15 @@ async def complete_task(
     print("")
     
     try:
-        # 将任务ID转换为字节数组
-        task_id_bytes = format_task_id(task_id)
-        
-        # 构建交易Payload
-        payload = EntryFunction.natural(
-            f"{platform_addr}::bidding_system",
-            "complete_task",
-            [], # 无类型参数
-            [
-                TransactionArgument(AccountAddress.from_str(platform_addr), Serializer.struct),
-                TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-            ],
-        )
+        # 构建交易Payload（平台地址和任务ID参数已按值缓存编码结果）
+        payload = build_task_payload(platform_addr, "complete_task", task_id)
         
-        # 生成并签名交易
-        signed_transaction = await client.create_bcs_signed_transaction(
-            winner_account, TransactionPayload(payload)
-        )
-        
-        # 提交交易
-        txn_hash = await client.submit_bcs_transaction(signed_transaction)
+        # 签名并提交交易（使用本地递增的序列号）
+        txn_hash = await submit_transaction(client, winner_account, payload, sequence_cache)
         print(f"交易提交中... 哈希: {txn_hash}")
         
         # 等待交易确认
-        await client.wait_for_transaction(txn_hash)
-        tx_info = await client.transaction_by_hash(txn_hash)
+        tx_info = await wait_for_transaction_info(client, txn_hash)
         
         print(f"任务完成成功! 交易版本: {tx_info['version']}")
         print("")
@@ -79,8 +76,6 @@ async def complete_task(
     except Exception as e:
         print(f"任务完成失败: {e}")
         return False
-    finally:
-        await client.close()
 
 
 async def main():
@@ -98,14 +93,15 @@ async def main():
     
     args = parser.parse_args()
     
-    # 获取平台地址
-    platform_addr = args.platform if args.platform else get_platform_address(DEFAULT_PROFILE)
-    
     # 验证参数
     if len(args.task_id.strip()) == 0:
         print("错误: 任务ID不能为空")
         return
     
+    # 参数校验通过后再获取平台地址（需要读取配置文件）
+    # 平台部署在默认 profile 的账户下，--profile 指定的是交易发送者，两者通常不同
+    platform_addr = args.platform if args.platform else get_platform_address(DEFAULT_PROFILE)
+    
     # 完成任务
     success = await complete_task(
         args.profile,
@@ -120,4 +116,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_script(main)
\ No newline at end of file
@@ -6,8 +6,9 @@ Aptos Bidding System - 部署脚本
 
 import argparse
 import asyncio
-import subprocess
+import hashlib
 import sys
+from collections import deque
 from pathlib import Path
 from aptos_sdk.bcs import Serializer
 from aptos_sdk.transactions import (
@@ -15,64 +16,145 @@ from aptos_sdk.transactions import (
     TransactionPayload,
     TransactionArgument,
 )
-from common_bidding import get_client_and_account, get_platform_address, get_function_id, DEFAULT_PROFILE
+from common_bidding import get_client_and_account, get_platform_address, get_function_id, wait_for_transaction_info, platform_payload_template, run_script, DEFAULT_PROFILE
+
+# 编译成功后写入 build 目录的源码哈希标记，源码未变时跳过重新编译
+SOURCE_HASH_MARKER = ".src_hash"
+
+# 子进程每个输出流最多保留的末尾行数，避免编译器输出过多时占用大量内存
+OUTPUT_TAIL_LINES = 200
+
+# 编译和测试使用的固定命令
+COMPILE_CMD = ("aptos", "move", "compile", "--save-metadata")
+TEST_CMD = ("aptos", "move", "test")
 
 
 class BiddingDeployer:
     def __init__(self, profile: str = DEFAULT_PROFILE):
         self.profile = profile
         self.project_root = Path(__file__).parent.parent.parent
+        self.build_dir = self.project_root / "build"
+        
+        # 共享的 REST 客户端和部署者账户（首次需要时在 get_client_and_account 中获取）
+        self._client = None
+        self._account = None
+    
+    async def __aenter__(self):
+        """客户端和账户延迟到部署、初始化和验证步骤才获取，编译和测试不需要 Aptos 配置文件"""
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        """释放对共享 REST 客户端的引用（客户端由 run_script 在退出时关闭）"""
+        self._client = None
+        self._account = None
+    
+    async def get_client_and_account(self) -> tuple:
+        """首次调用时获取进程内共享的 REST 客户端并加载部署者账户，之后的步骤复用同一连接"""
+        if self._client is None:
+            self._client, self._account = await get_client_and_account(self.profile)
+        return self._client, self._account
+    
+    async def warm_up_connection(self):
+        """预先查询链 ID，让到节点的连接在编译期间建立好"""
+        client, _ = await self.get_client_and_account()
+        await client.chain_id()
         
-    def run_command(self, cmd: list, cwd: Path = None) -> tuple[int, str, str]:
-        """执行命令并返回结果"""
+    async def run_command(self, cmd: tuple, cwd: Path = None) -> tuple[int, str, str]:
+        """执行命令并返回结果（异步子进程，等待期间不阻塞事件循环）"""
         if cwd is None:
             cwd = self.project_root
             
         print(f"执行命令: {' '.join(cmd)}")
         print(f"工作目录: {cwd}")
         
-        result = subprocess.run(
-            cmd,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=cwd,
-            capture_output=True,
-            text=True
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        stdout_tail, stderr_tail = await asyncio.gather(
+            self.read_tail(proc.stdout), self.read_tail(proc.stderr)
+        )
+        await proc.wait()
         
-        return result.returncode, result.stdout, result.stderr
+        return proc.returncode, self.join_tail(stdout_tail), self.join_tail(stderr_tail)
+    
+    @staticmethod
+    async def read_tail(stream: asyncio.StreamReader) -> deque:
+        """逐行读取输出流，只保留最后 OUTPUT_TAIL_LINES 行的原始字节"""
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            tail.append(line)
+        return tail
     
-    def compile_contract(self) -> bool:
-        """编译智能合约"""
+    @staticmethod
+    def join_tail(tail: deque) -> str:
+        """拼接并解码保留的输出行"""
+        return b"".join(tail).decode(errors="replace")
+    
+    def source_files(self) -> list:
+        """参与编译的 Move 源文件和包配置，按路径排序"""
+        files = sorted(self.project_root.glob("sources/*.move")) + sorted(self.project_root.glob("scripts/*.move"))
+        return files + [self.project_root / "Move.toml"]
+    
+    def source_hash(self) -> str:
+        """计算所有源文件内容的 SHA-256"""
+        digest = hashlib.sha256()
+        for path in self.source_files():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+    
+    def is_build_current(self) -> bool:
+        """build 目录中的哈希标记与当前源码一致时返回 True"""
+        marker = self.build_dir / SOURCE_HASH_MARKER
+        if not marker.exists():
+            return False
+        # 先比较修改时间：有源文件比标记新时直接判定需要重新编译，不必计算哈希
+        marker_mtime = marker.stat().st_mtime
+        if any(path.stat().st_mtime > marker_mtime for path in self.source_files()):
+            return False
+        return marker.read_text().strip() == self.source_hash()
+    
+    async def compile_contract(self, force: bool = False) -> bool:
+        """编译智能合约（源码未变化且 force 为 False 时跳过）"""
         print("=" * 50)
         print("步骤 1: 编译智能合约")
         print("=" * 50)
         
+        if not force and self.is_build_current():
+            print("源码未变化，跳过编译")
+            return True
+        
         # 清理之前的构建
-        build_path = self.project_root / "build"
-        if build_path.exists():
+        if self.build_dir.exists():
             import shutil
-            shutil.rmtree(build_path)
+            shutil.rmtree(self.build_dir)
             print("清理旧的构建文件")
         
         # 编译合约
-        cmd = ["aptos", "move", "compile", "--save-metadata"]
-        returncode, stdout, stderr = self.run_command(cmd)
+        returncode, stdout, stderr = await self.run_command(COMPILE_CMD)
         
         if returncode != 0:
             print(f"编译失败: {stderr}")
             return False
         
+        (self.build_dir / SOURCE_HASH_MARKER).write_text(self.source_hash())
         print("编译成功!")
         print(f"输出: {stdout}")
         return True
     
-    def run_tests(self) -> bool:
+    async def run_tests(self) -> bool:
         """运行单元测试"""
         print("=" * 50)
         print("步骤 2: 运行单元测试")
         print("=" * 50)
         
-        cmd = ["aptos", "move", "test"]
-        returncode, stdout, stderr = self.run_command(cmd)
+        returncode, stdout, stderr = await self.run_command(TEST_CMD)
         
         if returncode != 0:
             print(f"测试失败: {stderr}")
@@ -82,7 +164,7 @@ class BiddingDeployer:
         print(f"输出: {stdout}")
         return True
     
-    def deploy_contract(self) -> bool:
+    async def deploy_contract(self) -> bool:
         """部署智能合约"""
         print("=" * 50)
         print("步骤 3: 部署智能合约")
@@ -102,7 +184,7 @@ class BiddingDeployer:
             "--assume-yes"
         ]
         
-        returncode, stdout, stderr = self.run_command(cmd)
+        returncode, stdout, stderr = await self.run_command(cmd)
         
         # 检查是否包含错误（区分警告和错误）
         if returncode != 0:
@@ -118,34 +200,24 @@ class BiddingDeployer:
             print("部署成功!")
             print(f"输出: {stdout}")
         
-        # 验证部署是否实际成功 - 检查模块是否存在
+        # 验证部署是否实际成功 - 通过 REST 接口检查模块是否存在（复用已建立的连接，不再启动 aptos CLI）
         print("验证部署状态...")
-        verify_cmd = ["aptos", "account", "list", "--profile", self.profile, "--query", "modules"]
-        verify_returncode, verify_stdout, verify_stderr = self.run_command(verify_cmd)
+        try:
+            client, _ = await self.get_client_and_account()
+            modules = await client.account_modules(platform_addr)
+        except Exception as e:
+            print(f"验证部署状态失败: {e}")
+            return False
         
-        if verify_returncode == 0:
-            import json
-            try:
-                result = json.loads(verify_stdout)
-                modules = result.get("Result", [])
-                
-                # 检查是否包含 bidding_system 模块
-                has_bidding_system = any("bidding_system" in str(module) for module in modules)
-                
-                if has_bidding_system:
-                    print("✓ bidding_system 模块部署成功")
-                    return True
-                else:
-                    print("✗ bidding_system 模块未找到")
-                    print(f"已部署模块: {modules}")
-                    return False
-                    
-            except json.JSONDecodeError as e:
-                print(f"解析模块列表失败: {e}")
-                print(f"原始输出: {verify_stdout}")
-                return False
+        module_names = {module.get("abi", {}).get("name") for module in modules}
+        
+        # 检查是否包含 bidding_system 模块
+        if "bidding_system" in module_names:
+            print("✓ bidding_system 模块部署成功")
+            return True
         else:
-            print(f"验证部署状态失败: {verify_stderr}")
+            print("✗ bidding_system 模块未找到")
+            print(f"已部署模块: {module_names}")
             return False
     
     async def initialize_platform(self) -> bool:
@@ -155,15 +227,16 @@ class BiddingDeployer:
         print("=" * 50)
         
         try:
-            client, account = await get_client_and_account(self.profile)
+            client, account = await self.get_client_and_account()
             platform_addr = str(account.address())
             
             print(f"平台地址: {platform_addr}")
             print(f"初始化 BiddingPlatform 资源...")
             
-            # 构建初始化交易
-            payload = EntryFunction.natural(
-                f"{platform_addr}::bidding_system",
+            # 构建初始化交易（复用缓存的 bidding_system 模块ID）
+            module, _ = platform_payload_template(platform_addr)
+            payload = EntryFunction(
+                module,
                 "initialize",
                 [],  # 无类型参数
                 []   # 无函数参数
@@ -179,8 +252,7 @@ class BiddingDeployer:
             print(f"交易提交中... 哈希: {txn_hash}")
             
             # 等待交易确认
-            await client.wait_for_transaction(txn_hash)
-            tx_info = await client.transaction_by_hash(txn_hash)
+            tx_info = await wait_for_transaction_info(client, txn_hash)
             
             print(f"初始化成功! 交易版本: {tx_info['version']}")
             return True
@@ -188,8 +260,6 @@ class BiddingDeployer:
         except Exception as e:
             print(f"初始化失败: {e}")
             return False
-        finally:
-            await client.close()
     
     async def verify_deployment(self) -> bool:
         """验证部署状态"""
@@ -198,22 +268,28 @@ class BiddingDeployer:
         print("=" * 50)
         
         try:
-            client, account = await get_client_and_account(self.profile)
+            client, account = await self.get_client_and_account()
             platform_addr = str(account.address())
             
             print(f"检查平台地址: {platform_addr}")
             
-            # 检查平台资源是否存在
+            # 同时读取账户资源和模块，检查平台资源和 bidding_system 模块是否都存在
             resource_type = f"{platform_addr}::bidding_system::BiddingPlatform"
             try:
-                resources = await client.account_resources(platform_addr)
-                platform_resource = None
+                resources, modules = await asyncio.gather(
+                    client.account_resources(platform_addr),
+                    client.account_modules(platform_addr),
+                )
+                resources_by_type = {resource['type']: resource for resource in resources}
+                module_names = {module.get('abi', {}).get('name') for module in modules}
                 
-                for resource in resources:
-                    if resource['type'] == resource_type:
-                        platform_resource = resource
-                        break
+                if "bidding_system" in module_names:
+                    print("✓ bidding_system 模块已部署")
+                else:
+                    print("✗ bidding_system 模块未找到")
+                    return False
                 
+                platform_resource = resources_by_type.get(resource_type)
                 if platform_resource:
                     print("✓ BiddingPlatform 资源已创建")
                     print(f"  平台统计: {platform_resource['data']}")
@@ -229,25 +305,30 @@ class BiddingDeployer:
         except Exception as e:
             print(f"验证失败: {e}")
             return False
-        finally:
-            await client.close()
     
-    async def full_deployment(self) -> bool:
+    async def full_deployment(self, force_compile: bool = False) -> bool:
         """完整部署流程"""
         print("Aptos Bidding System 部署开始")
         print(f"配置文件: {self.profile}")
         print(f"项目目录: {self.project_root}")
         
-        # 步骤1: 编译
-        if not self.compile_contract():
+        # 步骤1: 编译，同时预先查询链 ID，让到节点的连接在编译期间建立好
+        # 预热失败不影响编译结果，后续需要链 ID 时会重新查询
+        compiled, _ = await asyncio.gather(
+            self.compile_contract(force_compile), self.warm_up_connection(), return_exceptions=True
+        )
+        if isinstance(compiled, Exception):
+            print(f"编译失败: {compiled}")
+            return False
+        if not compiled:
             return False
         
-        # 步骤2: 测试
-        if not self.run_tests():
+        # 步骤2: 测试（与编译共用 build 目录，需在编译完成后执行）
+        if not await self.run_tests():
             return False
         
         # 步骤3: 部署
-        if not self.deploy_contract():
+        if not await self.deploy_contract():
             return False
         
         # 步骤4: 初始化
@@ -280,25 +361,29 @@ async def main():
         default="all",
         help="指定执行步骤 (默认: all)"
     )
+    parser.add_argument(
+        "--force-compile",
+        action="store_true",
+        help="忽略源码哈希标记，总是重新编译"
+    )
     
     args = parser.parse_args()
     
-    deployer = BiddingDeployer(args.profile)
-    
     success = False
     
-    if args.step == "compile":
-        success = deployer.compile_contract()
-    elif args.step == "test":
-        success = deployer.run_tests()
-    elif args.step == "deploy":
-        success = deployer.deploy_contract()
-    elif args.step == "init":
-        success = await deployer.initialize_platform()
-    elif args.step == "verify":
-        success = await deployer.verify_deployment()
-    elif args.step == "all":
-        success = await deployer.full_deployment()
+    async with BiddingDeployer(args.profile) as deployer:
+        if args.step == "compile":
+            success = await deployer.compile_contract(force=args.force_compile)
+        elif args.step == "test":
+            success = await deployer.run_tests()
+        elif args.step == "deploy":
+            success = await deployer.deploy_contract()
+        elif args.step == "init":
+            success = await deployer.initialize_platform()
+        elif args.step == "verify":
+            success = await deployer.verify_deployment()
+        elif args.step == "all":
+            success = await deployer.full_deployment(force_compile=args.force_compile)
     
     if success:
         print("操作成功完成!")
@@ -309,4 +394,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_script(main)
\ No newline at end of file
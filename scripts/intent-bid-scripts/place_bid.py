@@ -5,33 +5,128 @@ Service Agent 对发布的任务进行竞标
 """
 
 import argparse
-import asyncio
+import sys
+from typing import List, Optional, Tuple
+from aptos_sdk.account import Account
+from aptos_sdk.async_client import RestClient
 from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
 from aptos_sdk.transactions import (
     EntryFunction,
     TransactionPayload,
     TransactionArgument,
 )
 from common_bidding import (
-    get_client_and_account, 
+    get_shared_client,
+    load_account_from_profile,
     get_platform_address,
     format_task_id,
+    submit_transaction,
+    submit_transactions,
+    wait_for_transaction_info,
+    wait_for_transactions,
+    SequenceNumberCache,
     format_amount,
+    run_script,
+    U8_SEQUENCE_SEQUENCE_SERIALIZER,
+    U64_SEQUENCE_SERIALIZER,
+    platform_payload_template,
+    encode_task_id_arg,
     DEFAULT_PROFILE
 )
 
 
+def build_bid_payload(platform_addr: str, task_id: str, bid_price: int, reputation_score: int) -> TransactionPayload:
+    """构建 place_bid 交易Payload，只编码每次竞标不同的参数"""
+    module, platform_arg_bytes = platform_payload_template(platform_addr)
+    
+    payload = EntryFunction(
+        module,
+        "place_bid",
+        [], # 无类型参数
+        [
+            platform_arg_bytes,
+            encode_task_id_arg(task_id),
+            TransactionArgument(bid_price, Serializer.u64).encode(),
+            TransactionArgument(reputation_score, Serializer.u64).encode(),
+        ],
+    )
+    return TransactionPayload(payload)
+
+
+def build_bids_batch_payload(platform_addr: str, bids: List[Tuple[str, int, int]]) -> TransactionPayload:
+    """构建 place_bids_batch 交易Payload，一笔交易对多个任务竞标"""
+    module, platform_arg_bytes = platform_payload_template(platform_addr)
+    task_ids = [format_task_id(task_id) for task_id, _, _ in bids]
+    bid_prices = [bid_price for _, bid_price, _ in bids]
+    reputation_scores = [reputation_score for _, _, reputation_score in bids]
+    
+    payload = EntryFunction(
+        module,
+        "place_bids_batch",
+        [], # 无类型参数
+        [
+            platform_arg_bytes,
+            TransactionArgument(task_ids, U8_SEQUENCE_SEQUENCE_SERIALIZER).encode(),
+            TransactionArgument(bid_prices, U64_SEQUENCE_SERIALIZER).encode(),
+            TransactionArgument(reputation_scores, U64_SEQUENCE_SERIALIZER).encode(),
+        ],
+    )
+    return TransactionPayload(payload)
+
+
+async def submit_bid(
+    client: RestClient,
+    bidder_account: Account,
+    platform_addr: str,
+    task_id: str,
+    bid_price: int,
+    reputation_score: int,
+    sequence_cache: Optional[SequenceNumberCache] = None,
+) -> str:
+    """签名并提交竞标交易，节点接受后立即返回交易哈希，不等待确认"""
+    payload = build_bid_payload(platform_addr, task_id, bid_price, reputation_score)
+    return await submit_transaction(client, bidder_account, payload, sequence_cache)
+
+
+async def await_bid_confirmation(client: RestClient, txn_hash: str) -> dict:
+    """等待 submit_bid 提交的竞标交易确认，返回已确认的交易信息"""
+    return await wait_for_transaction_info(client, txn_hash)
+
+
 async def place_bid(
     profile: str,
     platform_addr: str,
     task_id: str,
     bid_price: int,
     reputation_score: int,
+    client: Optional[RestClient] = None,
+    wait: bool = True,
 ):
-    """对任务进行竞标"""
+    """对任务进行竞标（未传入 client 时使用进程内共享的客户端）"""
+    
+    if client is None:
+        client = await get_shared_client()
+    bidder_account = load_account_from_profile(profile)
+    return await place_bid_with_client(
+        client, bidder_account, platform_addr, task_id, bid_price, reputation_score, wait
+    )
+
+
+async def place_bid_with_client(
+    client: RestClient,
+    bidder_account: Account,
+    platform_addr: str,
+    task_id: str,
+    bid_price: int,
+    reputation_score: int,
+    wait: bool = True,
+    sequence_cache: Optional[SequenceNumberCache] = None,
+) -> bool:
+    """
+    对任务进行竞标（使用调用方的客户端且不关闭，cli.py 在多条命令间复用连接）。
     
-    client, bidder_account = await get_client_and_account(profile)
+    wait 为 False 时交易被节点接受后即返回，不等待上链确认。
+    """
     bidder_addr = str(bidder_account.address())
     
     print("=" * 50)
@@ -45,34 +140,18 @@ async def place_bid(
     print("")
     
     try:
-        # 将任务ID转换为字节数组
-        task_id_bytes = format_task_id(task_id)
-        
-        # 构建交易Payload
-        payload = EntryFunction.natural(
-            f"{platform_addr}::bidding_system",
-            "place_bid",
-            [], # 无类型参数
-            [
-                TransactionArgument(AccountAddress.from_str(platform_addr), Serializer.struct),
-                TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-                TransactionArgument(bid_price, Serializer.u64),
-                TransactionArgument(reputation_score, Serializer.u64),
-            ],
-        )
-        
-        # 生成并签名交易
-        signed_transaction = await client.create_bcs_signed_transaction(
-            bidder_account, TransactionPayload(payload)
+        # 签名并提交交易
+        txn_hash = await submit_bid(
+            client, bidder_account, platform_addr, task_id, bid_price, reputation_score, sequence_cache
         )
-        
-        # 提交交易
-        txn_hash = await client.submit_bcs_transaction(signed_transaction)
         print(f"交易提交中... 哈希: {txn_hash}")
         
+        if not wait:
+            print("竞标交易已被节点接受，未等待确认")
+            return True
+        
         # 等待交易确认
-        await client.wait_for_transaction(txn_hash)
-        tx_info = await client.transaction_by_hash(txn_hash)
+        tx_info = await await_bid_confirmation(client, txn_hash)
         
         print(f"竞标提交成功! 交易版本: {tx_info['version']}")
         print(f"竞标价格: {format_amount(bid_price)}")
@@ -84,8 +163,91 @@ async def place_bid(
     except Exception as e:
         print(f"竞标失败: {e}")
         return False
-    finally:
-        await client.close()
+
+
+async def place_bids_batch_with_client(
+    client: RestClient,
+    bidder_account: Account,
+    platform_addr: str,
+    bids: List[Tuple[str, int, int]],
+    sequence_cache: Optional[SequenceNumberCache] = None,
+) -> List[bool]:
+    """
+    批量竞标：从序列号缓存中一次预留连续序列号，按连续序列号签名所有交易，
+    然后并发提交，并用一个轮询循环等待全部确认，返回与 bids 一一对应的结果。
+    """
+    bidder_addr = str(bidder_account.address())
+    
+    print("=" * 50)
+    print(f"批量提交 {len(bids)} 个竞标")
+    print("=" * 50)
+    print(f"竞标者: {bidder_addr}")
+    print(f"平台地址: {platform_addr}")
+    for task_id, bid_price, reputation_score in bids:
+        print(f"  任务 {task_id}: 价格 {format_amount(bid_price)}, 声誉 {reputation_score}")
+    print("")
+    
+    try:
+        payloads = [
+            build_bid_payload(platform_addr, task_id, bid_price, reputation_score)
+            for task_id, bid_price, reputation_score in bids
+        ]
+        submitted = await submit_transactions(client, bidder_account, payloads, sequence_cache)
+        tx_infos = await wait_for_transactions(client, submitted)
+    except Exception as e:
+        print(f"批量竞标失败: {e}")
+        return [False] * len(bids)
+    
+    results = []
+    for (task_id, _, _), tx_info in zip(bids, tx_infos):
+        if isinstance(tx_info, Exception):
+            print(f"任务 {task_id} 竞标失败: {tx_info}")
+            results.append(False)
+        else:
+            print(f"任务 {task_id} 竞标成功! 交易版本: {tx_info['version']}")
+            results.append(True)
+    
+    return results
+
+
+async def place_bids_in_one_transaction_with_client(
+    client: RestClient,
+    bidder_account: Account,
+    platform_addr: str,
+    bids: List[Tuple[str, int, int]],
+    sequence_cache: Optional[SequenceNumberCache] = None,
+) -> bool:
+    """
+    用一笔 place_bids_batch 交易提交多个竞标：一次签名、一个序列号、一次确认。
+    
+    交易是原子的，任何一个竞标失败时所有竞标都不会生效。
+    """
+    bidder_addr = str(bidder_account.address())
+    
+    print("=" * 50)
+    print(f"单笔交易提交 {len(bids)} 个竞标")
+    print("=" * 50)
+    print(f"竞标者: {bidder_addr}")
+    print(f"平台地址: {platform_addr}")
+    for task_id, bid_price, reputation_score in bids:
+        print(f"  任务 {task_id}: 价格 {format_amount(bid_price)}, 声誉 {reputation_score}")
+    print("")
+    
+    try:
+        # 签名并提交交易
+        payload = build_bids_batch_payload(platform_addr, bids)
+        txn_hash = await submit_transaction(client, bidder_account, payload, sequence_cache)
+        print(f"交易提交中... 哈希: {txn_hash}")
+        
+        # 等待交易确认
+        tx_info = await await_bid_confirmation(client, txn_hash)
+        
+        print(f"批量竞标成功! 交易版本: {tx_info['version']}")
+        return True
+        
+    except Exception as e:
+        print(f"批量竞标失败: {e}")
+        return False
 
 
 async def main():
@@ -102,12 +264,19 @@ async def main():
         "--platform",
         help="平台地址 (默认从profile获取)"
     )
+    parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="交易被节点接受后立即返回，不等待上链确认"
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="只输出交易哈希 (便于在 shell 循环中批量调用)"
+    )
     
     args = parser.parse_args()
     
-    # 获取平台地址
-    platform_addr = args.platform if args.platform else get_platform_address(DEFAULT_PROFILE)
-    
     # 验证参数
     if args.bid_price <= 0:
         print("错误: 竞标价格必须大于0")
@@ -121,6 +290,26 @@ async def main():
         print("错误: 任务ID不能为空")
         return
     
+    # 参数校验通过后再获取平台地址（需要读取配置文件）
+    # 平台部署在默认 profile 的账户下，--profile 指定的是交易发送者，两者通常不同
+    platform_addr = args.platform if args.platform else get_platform_address(DEFAULT_PROFILE)
+    
+    if args.quiet:
+        # 直接使用不打印任何信息的 submit_bid，成功时只输出一行交易哈希
+        client = await get_shared_client()
+        bidder_account = load_account_from_profile(args.profile)
+        try:
+            txn_hash = await submit_bid(
+                client, bidder_account, platform_addr, args.task_id, args.bid_price, args.reputation_score
+            )
+            if not args.no_wait:
+                await await_bid_confirmation(client, txn_hash)
+        except Exception as e:
+            sys.stderr.write(f"竞标失败: {e}\n")
+            sys.exit(1)
+        sys.stdout.write(f"{txn_hash}\n")
+        return
+    
     print(f"args.profile: {args.profile}")
     print(f"platform_addr: {platform_addr}")
     
@@ -131,6 +320,7 @@ async def main():
         args.task_id,
         args.bid_price,
         args.reputation_score,
+        wait=not args.no_wait,
     )
     
     if success:
@@ -140,4 +330,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_script(main)
\ No newline at end of file
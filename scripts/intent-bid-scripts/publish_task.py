@@ -5,9 +5,10 @@ Personal Agent 发布任务并托管资金
 """
 
 import argparse
-import asyncio
+import json
+import uuid
+from typing import List, Tuple
 from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
 from aptos_sdk.transactions import (
     EntryFunction,
     TransactionPayload,
@@ -17,11 +18,43 @@ from common_bidding import (
     get_client_and_account, 
     get_platform_address,
     format_task_id,
+    submit_transaction,
+    wait_for_transaction_info,
     format_amount,
+    run_script,
+    U8_SEQUENCE_SEQUENCE_SERIALIZER,
+    U64_SEQUENCE_SERIALIZER,
+    STR_SEQUENCE_SERIALIZER,
+    platform_payload_template,
+    encode_task_id_arg,
     DEFAULT_PROFILE
 )
 
 
+def build_publish_payload(
+    platform_addr: str,
+    task_id: str,
+    description: str,
+    max_budget: int,
+    deadline_seconds: int,
+) -> TransactionPayload:
+    """构建 publish_task 交易Payload"""
+    module, platform_arg_bytes = platform_payload_template(platform_addr)
+    payload = EntryFunction(
+        module,
+        "publish_task",
+        [], # 无类型参数
+        [
+            platform_arg_bytes,
+            encode_task_id_arg(task_id),
+            TransactionArgument(description, Serializer.str).encode(),
+            TransactionArgument(max_budget, Serializer.u64).encode(),
+            TransactionArgument(deadline_seconds, Serializer.u64).encode(),
+        ],
+    )
+    return TransactionPayload(payload)
+
+
 async def publish_task(
     profile: str,
     platform_addr: str,
@@ -47,35 +80,13 @@ async def publish_task(
     print("")
     
     try:
-        # 将任务ID转换为字节数组
-        task_id_bytes = format_task_id(task_id)
-        
-        # 构建交易Payload
-        payload = EntryFunction.natural(
-            f"{platform_addr}::bidding_system",
-            "publish_task",
-            [], # 无类型参数
-            [
-                TransactionArgument(AccountAddress.from_str(platform_addr), Serializer.struct),
-                TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-                TransactionArgument(description, Serializer.str),
-                TransactionArgument(max_budget, Serializer.u64),
-                TransactionArgument(deadline_seconds, Serializer.u64),
-            ],
-        )
-        
-        # 生成并签名交易
-        signed_transaction = await client.create_bcs_signed_transaction(
-            creator_account, TransactionPayload(payload)
-        )
-        
-        # 提交交易
-        txn_hash = await client.submit_bcs_transaction(signed_transaction)
+        # 签名并提交交易
+        payload = build_publish_payload(platform_addr, task_id, description, max_budget, deadline_seconds)
+        txn_hash = await submit_transaction(client, creator_account, payload)
         print(f"交易提交中... 哈希: {txn_hash}")
         
         # 等待交易确认
-        await client.wait_for_transaction(txn_hash)
-        tx_info = await client.transaction_by_hash(txn_hash)
+        tx_info = await wait_for_transaction_info(client, txn_hash)
         
         print(f"任务发布成功! 交易版本: {tx_info['version']}")
         print(f"资金已托管: {format_amount(max_budget)}")
@@ -87,16 +98,122 @@ async def publish_task(
     except Exception as e:
         print(f"任务发布失败: {e}")
         return False
-    finally:
-        await client.close()
+
+
+def build_publish_batch_payload(platform_addr: str, tasks: List[Tuple[str, str, int, int]]) -> TransactionPayload:
+    """构建 publish_tasks_batch 交易Payload，tasks 为 (任务ID, 描述, 最大预算, 截止时间) 列表"""
+    module, platform_arg_bytes = platform_payload_template(platform_addr)
+    payload = EntryFunction(
+        module,
+        "publish_tasks_batch",
+        [], # 无类型参数
+        [
+            platform_arg_bytes,
+            TransactionArgument(
+                [format_task_id(task_id) for task_id, _, _, _ in tasks],
+                U8_SEQUENCE_SEQUENCE_SERIALIZER,
+            ).encode(),
+            TransactionArgument(
+                [description for _, description, _, _ in tasks],
+                STR_SEQUENCE_SERIALIZER,
+            ).encode(),
+            TransactionArgument(
+                [max_budget for _, _, max_budget, _ in tasks],
+                U64_SEQUENCE_SERIALIZER,
+            ).encode(),
+            TransactionArgument(
+                [deadline_seconds for _, _, _, deadline_seconds in tasks],
+                U64_SEQUENCE_SERIALIZER,
+            ).encode(),
+        ],
+    )
+    return TransactionPayload(payload)
+
+
+async def publish_tasks_batch(
+    profile: str,
+    platform_addr: str,
+    tasks: List[Tuple[str, str, int, int]],
+):
+    """
+    用一笔 publish_tasks_batch 交易发布多个任务：一次签名、一个序列号、一次确认。
+    
+    交易是原子的，任何一个任务校验失败时所有任务都不会发布。
+    """
+    
+    client, creator_account = await get_client_and_account(profile)
+    creator_addr = str(creator_account.address())
+    
+    print("=" * 50)
+    print(f"单笔交易发布 {len(tasks)} 个任务")
+    print("=" * 50)
+    print(f"创建者: {creator_addr}")
+    print(f"平台地址: {platform_addr}")
+    for task_id, description, max_budget, deadline_seconds in tasks:
+        print(f"  任务 {task_id}: {description}, 预算 {format_amount(max_budget)}, 截止 {deadline_seconds} 秒")
+    print("")
+    
+    try:
+        # 签名并提交交易
+        txn_hash = await submit_transaction(
+            client, creator_account, build_publish_batch_payload(platform_addr, tasks)
+        )
+        print(f"交易提交中... 哈希: {txn_hash}")
+        
+        # 等待交易确认
+        tx_info = await wait_for_transaction_info(client, txn_hash)
+        
+        print(f"批量发布成功! 交易版本: {tx_info['version']}")
+        print(f"资金已托管: {format_amount(sum(task[2] for task in tasks))}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"批量发布失败: {e}")
+        return False
+
+
+def read_tasks_file(path: str) -> List[Tuple[str, str, int, int]]:
+    """
+    读取 JSONL 任务文件，每行: {"task_id": ..., "description": ..., "budget": ..., "deadline": ...}
+
+    与 personal_agent_cli.py 的任务文件格式一致，task_id 和 deadline 可省略
+    (分别自动生成和默认 3600 秒)；max_budget / deadline_seconds 作为别名同样接受。
+    格式错误时抛出 ValueError 并指出行号，文件中没有任务时同样抛出 ValueError。
+    """
+    tasks = []
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                task = json.loads(line)
+                tasks.append((
+                    task.get("task_id") or f"task-{uuid.uuid4().hex[:8]}",
+                    task["description"],
+                    int(task["budget"] if "budget" in task else task["max_budget"]),
+                    int(task.get("deadline", task.get("deadline_seconds", 3600))),
+                ))
+            except KeyError as e:
+                raise ValueError(f"任务文件第 {line_number} 行缺少字段 {e}")
+            except (TypeError, ValueError, AttributeError) as e:
+                raise ValueError(f"任务文件第 {line_number} 行格式错误: {e}")
+    
+    if not tasks:
+        raise ValueError(f"任务文件 {path} 中没有任务")
+    return tasks
 
 
 async def main():
     parser = argparse.ArgumentParser(description="发布任务到竞标平台")
-    parser.add_argument("task_id", type=str, help="任务的唯一ID")
-    parser.add_argument("description", type=str, help="任务描述")
-    parser.add_argument("max_budget", type=int, help="最大预算 (Octas)")
-    parser.add_argument("deadline_seconds", type=int, help="截止时间 (秒)")
+    parser.add_argument("task_id", type=str, nargs="?", help="任务的唯一ID")
+    parser.add_argument("description", type=str, nargs="?", help="任务描述")
+    parser.add_argument("max_budget", type=int, nargs="?", help="最大预算 (Octas)")
+    parser.add_argument("deadline_seconds", type=int, nargs="?", help="截止时间 (秒)")
+    parser.add_argument(
+        "--tasks-file",
+        help="从 JSONL 文件读取多个任务，用一笔交易全部发布 (此时忽略位置参数)"
+    )
     parser.add_argument(
         "--profile",
         default=DEFAULT_PROFILE,
@@ -109,31 +226,45 @@ async def main():
     
     args = parser.parse_args()
     
-    # 获取平台地址
-    platform_addr = args.platform if args.platform else get_platform_address(args.profile)
+    if args.tasks_file:
+        try:
+            tasks = read_tasks_file(args.tasks_file)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    elif args.deadline_seconds is None:
+        parser.error("请指定任务参数或 --tasks-file")
+    else:
+        tasks = [(args.task_id, args.description, args.max_budget, args.deadline_seconds)]
     
     # 验证参数
-    if args.max_budget <= 0:
-        print("错误: 最大预算必须大于0")
-        return
-    
-    if args.deadline_seconds <= 0:
-        print("错误: 截止时间必须大于0")
-        return
+    for task_id, _, max_budget, deadline_seconds in tasks:
+        if max_budget <= 0:
+            print(f"错误: 任务 {task_id} 的最大预算必须大于0")
+            return
+        
+        if deadline_seconds <= 0:
+            print(f"错误: 任务 {task_id} 的截止时间必须大于0")
+            return
+        
+        if len(task_id.strip()) == 0:
+            print("错误: 任务ID不能为空")
+            return
     
-    if len(args.task_id.strip()) == 0:
-        print("错误: 任务ID不能为空")
-        return
+    # 参数校验通过后再获取平台地址（需要读取配置文件）
+    platform_addr = args.platform if args.platform else get_platform_address(args.profile)
     
     # 发布任务
-    success = await publish_task(
-        args.profile,
-        platform_addr,
-        args.task_id,
-        args.description,
-        args.max_budget,
-        args.deadline_seconds,
-    )
+    if args.tasks_file:
+        success = await publish_tasks_batch(args.profile, platform_addr, tasks)
+    else:
+        success = await publish_task(
+            args.profile,
+            platform_addr,
+            args.task_id,
+            args.description,
+            args.max_budget,
+            args.deadline_seconds,
+        )
     
     if success:
         print("任务发布完成!")
@@ -142,4 +273,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_script(main)
\ No newline at end of file
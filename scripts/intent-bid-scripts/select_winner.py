@@ -5,22 +5,26 @@ Personal Agent 选择任务的中标者
 """
 
 import argparse
-import asyncio
-from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
-from aptos_sdk.transactions import (
-    EntryFunction,
-    TransactionPayload,
-    TransactionArgument,
-)
+from typing import List
+from aptos_sdk.transactions import TransactionPayload
 from common_bidding import (
     get_client_and_account, 
     get_platform_address,
-    format_task_id,
+    submit_transaction,
+    submit_transactions,
+    wait_for_transaction_info,
+    wait_for_transactions,
+    run_script,
+    build_task_payload,
     DEFAULT_PROFILE
 )
 
 
+def build_select_winner_payload(platform_addr: str, task_id: str) -> TransactionPayload:
+    """构建 select_winner 交易Payload（批量选择时只有任务ID参数不同）"""
+    return build_task_payload(platform_addr, "select_winner", task_id)
+
+
 async def select_winner(
     profile: str,
     platform_addr: str,
@@ -40,32 +44,12 @@ async def select_winner(
     print("")
     
     try:
-        # 将任务ID转换为字节数组
-        task_id_bytes = format_task_id(task_id)
-        
-        # 构建交易Payload
-        payload = EntryFunction.natural(
-            f"{platform_addr}::bidding_system",
-            "select_winner",
-            [], # 无类型参数
-            [
-                TransactionArgument(AccountAddress.from_str(platform_addr), Serializer.struct),
-                TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-            ],
-        )
-        
-        # 生成并签名交易
-        signed_transaction = await client.create_bcs_signed_transaction(
-            executor_account, TransactionPayload(payload)
-        )
-        
-        # 提交交易
-        txn_hash = await client.submit_bcs_transaction(signed_transaction)
+        # 签名并提交交易
+        txn_hash = await submit_transaction(client, executor_account, build_select_winner_payload(platform_addr, task_id))
         print(f"交易提交中... 哈希: {txn_hash}")
         
         # 等待交易确认
-        await client.wait_for_transaction(txn_hash)
-        tx_info = await client.transaction_by_hash(txn_hash)
+        tx_info = await wait_for_transaction_info(client, txn_hash)
         
         print(f"中标者选择成功! 交易版本: {tx_info['version']}")
         print("")
@@ -77,13 +61,52 @@ async def select_winner(
     except Exception as e:
         print(f"选择中标者失败: {e}")
         return False
-    finally:
-        await client.close()
+
+
+async def select_winners(
+    profile: str,
+    platform_addr: str,
+    task_ids: List[str],
+) -> List[bool]:
+    """
+    为多个任务选择中标者：先按连续序列号签名并提交全部交易，再用一个轮询循环等待全部确认，
+    所有交易只需等待一轮出块，而不是逐个提交、逐个等待。
+    """
+    
+    client, executor_account = await get_client_and_account(profile)
+    executor_addr = str(executor_account.address())
+    
+    print("=" * 50)
+    print(f"为 {len(task_ids)} 个任务选择中标者")
+    print("=" * 50)
+    print(f"执行者: {executor_addr}")
+    print(f"平台地址: {platform_addr}")
+    print(f"任务 ID: {', '.join(task_ids)}")
+    print("")
+    
+    try:
+        payloads = [build_select_winner_payload(platform_addr, task_id) for task_id in task_ids]
+        submitted = await submit_transactions(client, executor_account, payloads)
+        tx_infos = await wait_for_transactions(client, submitted)
+    except Exception as e:
+        print(f"选择中标者失败: {e}")
+        return [False] * len(task_ids)
+    
+    results = []
+    for task_id, tx_info in zip(task_ids, tx_infos):
+        if isinstance(tx_info, Exception):
+            print(f"任务 {task_id} 选择中标者失败: {tx_info}")
+            results.append(False)
+        else:
+            print(f"任务 {task_id} 中标者选择成功! 交易版本: {tx_info['version']}")
+            results.append(True)
+    
+    return results
 
 
 async def main():
     parser = argparse.ArgumentParser(description="选择任务的中标者")
-    parser.add_argument("task_id", type=str, help="任务的唯一ID")
+    parser.add_argument("task_ids", type=str, nargs="+", metavar="task_id", help="任务的唯一ID (可指定多个，一起提交后统一等待确认)")
     parser.add_argument(
         "--profile",
         default=DEFAULT_PROFILE,
@@ -96,20 +119,23 @@ async def main():
     
     args = parser.parse_args()
     
-    # 获取平台地址
-    platform_addr = args.platform if args.platform else get_platform_address(args.profile)
-    
     # 验证参数
-    if len(args.task_id.strip()) == 0:
+    if any(len(task_id.strip()) == 0 for task_id in args.task_ids):
         print("错误: 任务ID不能为空")
         return
     
+    # 参数校验通过后再获取平台地址（需要读取配置文件）
+    platform_addr = args.platform if args.platform else get_platform_address(args.profile)
+    
     # 选择中标者
-    success = await select_winner(
-        args.profile,
-        platform_addr,
-        args.task_id,
-    )
+    if len(args.task_ids) > 1:
+        success = all(await select_winners(args.profile, platform_addr, args.task_ids))
+    else:
+        success = await select_winner(
+            args.profile,
+            platform_addr,
+            args.task_ids[0],
+        )
     
     if success:
         print("中标者选择完成!")
@@ -118,4 +144,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_script(main)
\ No newline at end of file
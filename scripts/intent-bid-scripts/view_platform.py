@@ -5,11 +5,12 @@ Aptos Bidding System - 平台统计脚本
 """
 
 import argparse
-import asyncio
 from common_bidding import (
     get_client_and_account, 
     get_platform_address,
     print_platform_stats,
+    call_view,
+    run_script,
     DEFAULT_PROFILE
 )
 
@@ -30,14 +31,10 @@ async def view_platform_stats(
     
     try:
         # 调用 get_platform_stats view 函数
-        result = await client.view(
-            f"{platform_addr}::bidding_system::get_platform_stats",
-            [],
-            [platform_addr]
-        )
+        result = await call_view(client, platform_addr, "get_platform_stats", [platform_addr])
         
         if result:
-            # 返回的是 (total_tasks, completed_tasks, cancelled_tasks) 元组
+            # 返回的是 [total_tasks, completed_tasks, cancelled_tasks] 列表
             stats = result  # 直接使用结果
             
             print("平台统计:")
@@ -76,8 +73,6 @@ async def view_platform_stats(
     except Exception as e:
         print(f"查询平台统计失败: {e}")
         return False
-    finally:
-        await client.close()
 
 
 async def main():
@@ -107,4 +102,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_script(main)
\ No newline at end of file
@@ -6,24 +6,84 @@ Aptos Bidding System - 查看任务脚本
 
 import argparse
 import asyncio
+from typing import List, Optional
+from aptos_sdk.async_client import RestClient
 from common_bidding import (
-    get_client_and_account, 
+    get_shared_client,
     get_platform_address,
+    task_id_hex,
+    call_view,
+    is_task_not_found_error,
     format_task_id,
     print_task_info,
     print_bid_info,
+    run_script,
     DEFAULT_PROFILE
 )
 
+# 一次查看多个任务时同时进行中的最大任务查询数，避免对节点发起过多并发请求
+VIEW_CONCURRENCY = 20
+
+
+async def fetch_task(client: RestClient, platform_addr: str, task_id: str) -> tuple:
+    """
+    同时调用 get_task 和 get_task_bids view 函数，两个查询只等待一次往返。
+    
+    任务不存在时 get_task 会中止，此时返回 (None, None)，
+    不需要再单独调用 task_exists 确认。
+    """
+    # 将任务ID转换为十六进制格式
+    task_id_arg = task_id_hex(task_id)
+    
+    result, bid_result = await asyncio.gather(
+        call_view(client, platform_addr, "get_task", [platform_addr, task_id_arg]),
+        call_view(client, platform_addr, "get_task_bids", [platform_addr, task_id_arg]),
+        return_exceptions=True,
+    )
+    if is_task_not_found_error(result):
+        return None, None
+    for value in (result, bid_result):
+        if isinstance(value, Exception):
+            raise value
+    return result, bid_result
+
+
+def print_task_result(result, bid_result) -> bool:
+    """打印任务查询结果，任务不存在时返回 False"""
+    if not result:
+        print("任务未找到")
+        return False
+    
+    # view 函数的返回值列表中只有一个 Task 结构体
+    task_data = result[0]
+    
+    print("任务详细信息:")
+    print("-" * 30)
+    # 暂时直接打印解析后的数据，因为结构可能不同
+    print(f"原始任务数据: {task_data}")
+    print("")
+    
+    # get_task_bids 返回一个 vector<Bid>，没有竞标时为空列表
+    if bid_result and bid_result[0]:
+        bids = bid_result[0]
+        print(f"竞标信息: {bids}")
+        print("")
+    else:
+        print("当前没有竞标信息")
+    
+    return True
+
 
 async def view_task(
     profile: str,
     platform_addr: str,
     task_id: str,
+    client: Optional[RestClient] = None,
 ):
-    """查看任务详细信息"""
+    """查看任务详细信息（未传入 client 时使用进程内共享的客户端）"""
     
-    client, account = await get_client_and_account(profile)
+    if client is None:
+        client = await get_shared_client()
     
     print("=" * 50)
     print("查看任务信息")
@@ -33,86 +93,86 @@ async def view_task(
     print("")
     
     try:
-        # 将任务ID转换为十六进制格式
-        task_id_hex = "0x" + task_id.encode('utf-8').hex()
-        
-        # 调用 get_task view 函数
-        result = await client.view(
-            f"{platform_addr}::bidding_system::get_task",
-            [],
-            [platform_addr, task_id_hex]
-        )
-        
-        if result:
-            # 假设返回的是任务结构体数据
-            task_data = result  # 直接使用结果，不是第一个元素
-            
-            print("任务详细信息:")
-            print("-" * 30)
-            # 暂时直接打印原始数据，因为结构可能不同
-            print(f"原始任务数据: {task_data}")
-            print("")
-            
-            # 获取竞标信息
-            bid_result = await client.view(
-                f"{platform_addr}::bidding_system::get_task_bids",
-                [],
-                [platform_addr, task_id_hex]
-            )
-            
-            if bid_result:
-                bids = bid_result
-                print(f"竞标信息: {bids}")
-                print("")
-            else:
-                print("当前没有竞标信息")
-        else:
-            print("任务未找到")
-            return False
-        
-        return True
+        result, bid_result = await fetch_task(client, platform_addr, task_id)
+        return print_task_result(result, bid_result)
         
     except Exception as e:
         print(f"查询任务失败: {e}")
         return False
-    finally:
-        await client.close()
+
+
+async def view_tasks(
+    profile: str,
+    platform_addr: str,
+    task_ids: List[str],
+    client: Optional[RestClient] = None,
+) -> List[bool]:
+    """
+    查看多个任务：所有任务的 view 调用并发执行（最多 VIEW_CONCURRENCY 个任务同时查询），
+    再按输入顺序打印结果，返回与 task_ids 一一对应的结果。
+    """
+    
+    if client is None:
+        client = await get_shared_client()
+    semaphore = asyncio.Semaphore(VIEW_CONCURRENCY)
+    
+    async def fetch_bounded(task_id: str) -> tuple:
+        async with semaphore:
+            return await fetch_task(client, platform_addr, task_id)
+    
+    print("=" * 50)
+    print(f"查看 {len(task_ids)} 个任务信息")
+    print("=" * 50)
+    print(f"平台地址: {platform_addr}")
+    print("")
+    
+    fetched = await asyncio.gather(
+        *(fetch_bounded(task_id) for task_id in task_ids), return_exceptions=True
+    )
+    
+    results = []
+    for task_id, task_result in zip(task_ids, fetched):
+        print(f"任务 ID: {task_id}")
+        if isinstance(task_result, Exception):
+            print(f"查询任务失败: {task_result}")
+            results.append(False)
+        else:
+            results.append(print_task_result(*task_result))
+        print("")
+    
+    return results
 
 
 async def check_task_exists(
     profile: str,
     platform_addr: str,
     task_id: str,
+    client: Optional[RestClient] = None,
 ):
-    """检查任务是否存在"""
+    """检查任务是否存在（未传入 client 时使用进程内共享的客户端）"""
     
-    client, account = await get_client_and_account(profile)
+    if client is None:
+        client = await get_shared_client()
     
     try:
         # 将任务ID转换为十六进制格式
-        task_id_hex = "0x" + task_id.encode('utf-8').hex()
+        task_id_arg = task_id_hex(task_id)
         
         # 调用 task_exists view 函数
-        result = await client.view(
-            f"{platform_addr}::bidding_system::task_exists",
-            [],
-            [platform_addr, task_id_hex]
-        )
+        result = await call_view(client, platform_addr, "task_exists", [platform_addr, task_id_arg])
         
-        exists = result if result else False
+        exists = result[0] if result else False
         print(f"任务 {task_id} 存在: {exists}")
         return exists
         
     except Exception as e:
         print(f"检查任务存在性失败: {e}")
         return False
-    finally:
-        await client.close()
 
 
 async def main():
     parser = argparse.ArgumentParser(description="查看任务信息")
-    parser.add_argument("task_id", type=str, help="任务的唯一ID")
+    parser.add_argument("task_ids", type=str, nargs="+", metavar="task_id", help="任务的唯一ID (可指定多个，并发查询)")
     parser.add_argument(
         "--profile",
         default=DEFAULT_PROFILE,
@@ -130,19 +190,25 @@ async def main():
     
     args = parser.parse_args()
     
-    # 获取平台地址
-    platform_addr = args.platform if args.platform else get_platform_address(DEFAULT_PROFILE)
-    
     # 验证参数
-    if len(args.task_id.strip()) == 0:
+    if any(len(task_id.strip()) == 0 for task_id in args.task_ids):
         print("错误: 任务ID不能为空")
         return
     
+    # 参数校验通过后再获取平台地址（需要读取配置文件）
+    # 平台部署在默认 profile 的账户下，与 --profile 指定的查询账户无关
+    platform_addr = args.platform if args.platform else get_platform_address(DEFAULT_PROFILE)
+    
     # 执行查询
     if args.check_exists:
-        await check_task_exists(args.profile, platform_addr, args.task_id)
+        await asyncio.gather(
+            *(check_task_exists(args.profile, platform_addr, task_id) for task_id in args.task_ids)
+        )
     else:
-        success = await view_task(args.profile, platform_addr, args.task_id)
+        if len(args.task_ids) > 1:
+            success = all(await view_tasks(args.profile, platform_addr, args.task_ids))
+        else:
+            success = await view_task(args.profile, platform_addr, args.task_ids[0])
         
         if success:
             print("任务查询完成!")
@@ -151,4 +217,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_script(main)
\ No newline at end of file
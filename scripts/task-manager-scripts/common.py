@@ -1,7 +1,18 @@
 import yaml
+import httpx
+import json
 import os
-from aptos_sdk.async_client import RestClient
+import time
+import asyncio
+import hashlib
+import functools
+from collections import OrderedDict
+from typing import List, Optional
+from aptos_sdk.async_client import RestClient, ClientConfig, ApiError
 from aptos_sdk.account import Account
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.bcs import Serializer
+from aptos_sdk.transactions import RawTransaction, SignedTransaction, TransactionPayload
 
 # --- 配置 ---
 
@@ -12,10 +23,89 @@ FAUCET_URL = "https://faucet.devnet.aptoslabs.com"
 # 默认的配置文件路径
 DEFAULT_PROFILE = "task_manager_dev"
 
+# REST 客户端连接池配置：并发的提交和确认请求在同一条 HTTP/2 连接上多路复用
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# 合约模块名
+TASK_MANAGER_MODULE = "task_manager"
+
+# vector<u8> 参数的序列化器，所有交易参数共用同一个实例
+U8_SEQUENCE_SERIALIZER = Serializer.sequence_serializer(Serializer.u8)
+
+# --dry-run 离线签名时使用的占位序列号和链 ID（交易不会被提交，只用于检查参数和 BCS 编码）
+DRY_RUN_SEQUENCE_NUMBER = 0
+DRY_RUN_CHAIN_ID = 0
+
+# 交易哈希的域分隔前缀：sha3_256(b"APTOS::Transaction")
+TRANSACTION_HASH_PREFIX = hashlib.sha3_256(b"APTOS::Transaction").digest()
+
+# 已加载账户的缓存：(配置文件路径, profile) -> (修改时间, 文件大小, Account)
+# 配置文件的修改时间或大小变化后重新解析，超过上限时淘汰最久未使用的条目
+PROFILE_CACHE = OrderedDict()
+PROFILE_CACHE_MAX_ENTRIES = 100
+
+# PyYAML 编译了 libyaml 时使用 C 实现的加载器，否则回退到纯 Python 实现
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# 与 config.yaml 同目录的 JSON 缓存文件，只保存各 profile 的私钥，JSON 解析比 YAML 快得多
+CONFIG_SIDECAR_NAME = "config.json"
+
+# 等待交易确认时的轮询间隔（秒）：从较短间隔开始，按倍数退避到上限
+TRANSACTION_POLL_INITIAL = 0.1
+TRANSACTION_POLL_FACTOR = 2
+TRANSACTION_POLL_MAX = 1.0
+
 # --- 核心函数 ---
 
+def load_config(config_path: str) -> dict:
+    """
+    读取 Aptos 配置文件。
+    
+    同目录下的 config.json 不比 config.yaml 旧时直接读取 JSON，
+    否则解析 YAML 并重新写出 JSON（仅包含各 profile 的私钥，权限为 0600）。
+    JSON 写入失败（例如目录只读）不影响本次读取。
+    """
+    sidecar_path = os.path.join(os.path.dirname(config_path), CONFIG_SIDECAR_NAME)
+    try:
+        if os.stat(sidecar_path).st_mtime >= os.stat(config_path).st_mtime:
+            with open(sidecar_path, 'r') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=YAML_LOADER)
+
+    profiles = config.get("profiles") if isinstance(config, dict) else None
+    if isinstance(profiles, dict):
+        sidecar = {
+            "profiles": {
+                name: {"private_key": values.get("private_key")}
+                for name, values in profiles.items()
+                if isinstance(values, dict)
+            }
+        }
+        tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(sidecar, f)
+            os.replace(tmp_path, sidecar_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return config
+
+
+@functools.lru_cache(maxsize=32)
+def account_from_key(private_key: str) -> Account:
+    """由私钥构造账户（派生公钥有一定开销，配置文件变化但私钥未变时复用同一个 Account）"""
+    return Account.load_key(private_key)
+
+
 def load_account_from_profile(profile: str) -> Account:
-    """从 .aptos/config.yaml 中加载指定profile的账户"""
+    """从 .aptos/config.yaml 中加载指定profile的账户（配置文件未变化时直接返回缓存的账户）"""
     
     # 优先使用项目本地的配置文件，然后是全局配置文件
     local_config_path = os.path.join(".aptos", "config.yaml")
@@ -31,8 +121,14 @@ def load_account_from_profile(profile: str) -> Account:
             "Aptos config file not found in local ./.aptos/ or global ~/.aptos/"
         )
 
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    stat = os.stat(config_path)
+    cache_key = (os.path.abspath(config_path), profile)
+    cached = PROFILE_CACHE.get(cache_key)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        PROFILE_CACHE.move_to_end(cache_key)
+        return cached[2]
+
+    config = load_config(config_path)
 
     if "profiles" not in config or profile not in config["profiles"]:
         raise ValueError(f"Profile '{profile}' not found in aptos config file.")
@@ -41,20 +137,182 @@ def load_account_from_profile(profile: str) -> Account:
     if not private_key:
         raise ValueError(f"Private key not found for profile '{profile}'.")
         
-    return Account.load_key(private_key)
+    account = account_from_key(private_key)
+    PROFILE_CACHE[cache_key] = (stat.st_mtime, stat.st_size, account)
+    PROFILE_CACHE.move_to_end(cache_key)
+    if len(PROFILE_CACHE) > PROFILE_CACHE_MAX_ENTRIES:
+        PROFILE_CACHE.popitem(last=False)
+    return account
 
 
-async def get_client_and_account(profile: str = DEFAULT_PROFILE) -> tuple[RestClient, Account]:
+async def create_client() -> RestClient:
+    """
+    创建 Aptos REST 客户端。
+    
+    SDK 默认的 httpx 连接池较小，这里换成启用 HTTP/2 的更大连接池，
+    批量提交时的多个提交和确认请求复用同一条连接。
+    """
+    client = RestClient(NODE_URL)
+    default_client = client.client
+    client.client = httpx.AsyncClient(
+        http2=client.client_config.http2,
+        limits=HTTP_LIMITS,
+        timeout=default_client.timeout,
+        headers=default_client.headers,
+    )
+    await default_client.aclose()
+    return client
+
+
+async def get_client_and_account(
+    profile: str = DEFAULT_PROFILE,
+    client: Optional[RestClient] = None,
+) -> tuple[RestClient, Account]:
     """
     创建一个Aptos REST客户端并从指定的配置文件加载账户。
     
+    传入 client 时直接复用该客户端（及其已建立的连接），不再新建，
+    由调用方负责关闭。
+    
     返回:
         一个元组 (RestClient, Account)
     """
-    client = RestClient(NODE_URL)
+    if client is None:
+        client = await create_client()
     account = load_account_from_profile(profile)
     return client, account
 
+
+async def wait_for_transaction_info(client: RestClient, txn_hash: str) -> dict:
+    """
+    等待交易确认并直接返回已确认的交易信息。
+    
+    替代 SDK 的 wait_for_transaction + transaction_by_hash：
+    SDK 固定每秒轮询一次，这里从 0.1 秒开始按倍数退避到 1 秒，
+    交易很快上链时能更早拿到结果，确认后也不再额外请求一次交易详情。
+    """
+    deadline = time.monotonic() + client.client_config.transaction_wait_in_seconds
+    poll_interval = TRANSACTION_POLL_INITIAL
+    while True:
+        try:
+            tx_info = await client.transaction_by_hash(txn_hash)
+        except ApiError as e:
+            # 404 表示交易尚未被节点索引，继续等待
+            if e.status_code != 404:
+                raise
+            tx_info = None
+        
+        if tx_info is not None and tx_info.get("type") != "pending_transaction":
+            if not tx_info.get("success"):
+                raise Exception(f"交易执行失败: {tx_info.get('vm_status')} - {txn_hash}")
+            return tx_info
+        
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"交易 {txn_hash} 等待确认超时")
+        await asyncio.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+        poll_interval = min(poll_interval * TRANSACTION_POLL_FACTOR, TRANSACTION_POLL_MAX)
+
+
+async def prime_account_context(client: RestClient, account: Account) -> int:
+    """
+    同时查询账户的链上序列号和链 ID，返回序列号。
+    
+    链 ID 由客户端缓存，之后签名不再请求节点；Gas 参数取自 client_config，
+    所以按此序列号递增签名时，每笔交易只需要一次提交请求。
+    """
+    sequence_number, _ = await asyncio.gather(
+        client.account_sequence_number(account.address()), client.chain_id()
+    )
+    return sequence_number
+
+
+async def submit_transactions(client: RestClient, account: Account, payloads: List[TransactionPayload]) -> list:
+    """
+    用连续序列号签名多笔交易并并发提交，返回与 payloads 一一对应的交易哈希（提交失败的位置为异常对象）。
+    
+    只查询一次链上序列号和链 ID；逐笔提交时每笔交易都要先等上一笔确认，
+    这里先全部提交，再由 wait_for_transactions 统一等待确认。
+    某笔提交失败不影响其他交易的哈希，已被节点接受的交易仍会上链。
+    """
+    sequence_number = await prime_account_context(client, account)
+    signed_transactions = await asyncio.gather(*(
+        client.create_bcs_signed_transaction(account, payload, sequence_number=sequence_number + i)
+        for i, payload in enumerate(payloads)
+    ))
+    return list(await asyncio.gather(
+        *(client.submit_bcs_transaction(signed_transaction) for signed_transaction in signed_transactions),
+        return_exceptions=True,
+    ))
+
+
+async def _wait_for_submitted(client: RestClient, txn_hash):
+    """等待一笔已提交交易确认；提交失败的位置（异常对象）原样返回"""
+    if isinstance(txn_hash, Exception):
+        return txn_hash
+    return await wait_for_transaction_info(client, txn_hash)
+
+
+async def wait_for_transactions(client: RestClient, txn_hashes: list) -> list:
+    """并发等待多笔交易确认，返回与 txn_hashes 一一对应的交易信息（提交或执行失败的交易对应异常对象）"""
+    return await asyncio.gather(
+        *(_wait_for_submitted(client, txn_hash) for txn_hash in txn_hashes),
+        return_exceptions=True,
+    )
+
+
+def dry_run_transaction(account: Account, payload: TransactionPayload) -> str:
+    """
+    离线签名交易并输出签名后的大小和交易哈希，不连接节点，返回十六进制交易哈希。
+    
+    序列号和链 ID 使用占位值，Gas 参数与 SDK 默认配置一致，
+    用于在不提交交易的情况下检查参数和 BCS 编码。
+    """
+    config = ClientConfig()
+    raw_transaction = RawTransaction(
+        account.address(),
+        DRY_RUN_SEQUENCE_NUMBER,
+        payload,
+        config.max_gas_amount,
+        config.gas_unit_price,
+        int(time.time()) + config.expiration_ttl,
+        DRY_RUN_CHAIN_ID,
+    )
+    signed_bytes = SignedTransaction(raw_transaction, account.sign_transaction(raw_transaction)).bytes()
+    # 交易哈希对 Transaction::UserTransaction（枚举序号 0）的 BCS 编码计算
+    txn_hash = "0x" + hashlib.sha3_256(TRANSACTION_HASH_PREFIX + b"\x00" + signed_bytes).hexdigest()
+    
+    print("Dry run: 交易已离线签名，未提交")
+    print(f"  - 签名交易大小: {len(signed_bytes)} 字节")
+    print(f"  - 交易哈希: {txn_hash}")
+    return txn_hash
+
+
+def install_uvloop():
+    """安装 uvloop 事件循环（套接字和定时器处理更快），未安装 uvloop 时使用标准库事件循环"""
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_address(address: str) -> AccountAddress:
+    """解析十六进制地址字符串（批量创建任务时同一服务提供者地址反复出现，按字符串缓存）"""
+    return AccountAddress.from_str(address)
+
+
+@functools.lru_cache(maxsize=1024)
+def format_task_id(task_id: str) -> bytes:
+    """将字符串任务ID转换为字节数组（批量提交和重试时同一任务反复使用，按任务ID缓存）"""
+    return task_id.encode('utf-8')
+
+
+@functools.lru_cache(maxsize=16)
+def get_module_id(addr: str) -> str:
+    """构造 task_manager 模块ID（同一地址的交易共用，按地址缓存）"""
+    return f"{addr}::{TASK_MANAGER_MODULE}"
+
 if __name__ == '__main__':
     # 一个简单的测试，用于验证函数是否正常工作
     try:
@@ -1,57 +1,65 @@
 import argparse
 import asyncio
+import sys
+from typing import Optional
+from aptos_sdk.async_client import RestClient
 from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
 from aptos_sdk.transactions import (
     EntryFunction,
     TransactionPayload,
     TransactionArgument,
 )
-from common import get_client_and_account, DEFAULT_PROFILE
+from common import get_client_and_account, load_account_from_profile, dry_run_transaction, wait_for_transaction_info, prime_account_context, format_task_id, parse_address, get_module_id, U8_SEQUENCE_SERIALIZER, install_uvloop, DEFAULT_PROFILE
+
+def build_complete_task_payload(task_creator_addr: str, task_id: str) -> TransactionPayload:
+    """构建 complete_task 交易Payload"""
+    payload = EntryFunction.natural(
+        get_module_id(task_creator_addr),
+        "complete_task",
+        [],
+        [
+            TransactionArgument(parse_address(task_creator_addr), Serializer.struct),
+            TransactionArgument(format_task_id(task_id), U8_SEQUENCE_SERIALIZER),
+        ],
+    )
+    return TransactionPayload(payload)
 
 async def complete_task(
     profile: str,
     task_creator_addr: str,
     task_id: str,
+    client: Optional[RestClient] = None,
 ):
-    """构建并提交一个 complete_task 交易"""
+    """构建并提交一个 complete_task 交易（传入 client 时复用调用方的客户端，不在此关闭）"""
     
     # 注意：此处加载的账户是服务方(service_agent)
-    client, service_agent_account = await get_client_and_account(profile)
+    # 未传入 client 时新建客户端，并在结束时关闭；传入的客户端由调用方负责关闭
+    owns_client = client is None
+    client, service_agent_account = await get_client_and_account(profile, client)
     
     print("正在完成任务...")
     print(f"  - 服务提供者 (Profile: {profile}): {service_agent_account.address()}")
     print(f"  - 任务创建者地址: {task_creator_addr}")
     print(f"  - 任务ID: {task_id}")
 
-    # 将 task_id 字符串转换为字节数组
-    task_id_bytes = task_id.encode('utf-8')
-
-    payload = EntryFunction.natural(
-        f"{task_creator_addr}::task_manager",
-        "complete_task",
-        [],
-        [
-            TransactionArgument(AccountAddress.from_str(task_creator_addr), Serializer.struct),
-            TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-        ],
-    )
+    payload = build_complete_task_payload(task_creator_addr, task_id)
     
+    # 序列号和链 ID 同时查询，签名时不再依次请求节点
+    sequence_number = await prime_account_context(client, service_agent_account)
     signed_transaction = await client.create_bcs_signed_transaction(
-        service_agent_account, TransactionPayload(payload)
+        service_agent_account, payload, sequence_number=sequence_number
     )
     
     try:
         txn_hash = await client.submit_bcs_transaction(signed_transaction)
         print(f"交易提交中... 哈希: {txn_hash}")
-        await client.wait_for_transaction(txn_hash)
-
-        tx_info = await client.transaction_by_hash(txn_hash)
+        tx_info = await wait_for_transaction_info(client, txn_hash)
         print(f"交易成功! 版本: {tx_info['version']}")
     except Exception as e:
         print(f"交易失败: {e}")
     finally:
-        await client.close()
+        if owns_client:
+            await client.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="完成一个Aptos任务")
@@ -63,8 +71,22 @@ if __name__ == "__main__":
         help="指定服务方(签名者)的Aptos CLI profile",
     )
     
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="只在本地构建并签名交易，输出大小和哈希，不连接节点也不提交",
+    )
+    
     args = parser.parse_args()
     
+    if args.dry_run:
+        dry_run_transaction(
+            load_account_from_profile(args.profile),
+            build_complete_task_payload(args.task_creator_addr, args.task_id),
+        )
+        sys.exit(0)
+    
+    install_uvloop()
     asyncio.run(
         complete_task(
             args.profile,
@@ -1,14 +1,54 @@
 import argparse
 import asyncio
+import json
+import sys
+from typing import List, Optional, Tuple
+from aptos_sdk.async_client import RestClient
 from aptos_sdk.bcs import Serializer
-from aptos_sdk.account_address import AccountAddress
 from aptos_sdk.type_tag import TypeTag, StructTag
 from aptos_sdk.transactions import (
     EntryFunction,
     TransactionPayload,
     TransactionArgument,
 )
-from common import get_client_and_account, DEFAULT_PROFILE
+from common import (
+    get_client_and_account,
+    load_account_from_profile,
+    dry_run_transaction,
+    wait_for_transaction_info,
+    prime_account_context,
+    submit_transactions,
+    wait_for_transactions,
+    format_task_id,
+    parse_address,
+    get_module_id,
+    U8_SEQUENCE_SERIALIZER,
+    install_uvloop,
+    DEFAULT_PROFILE,
+)
+
+def build_create_task_payload(
+    creator_addr: str,
+    task_id: str,
+    service_agent: str,
+    amount_octas: int,
+    deadline_secs: int,
+    description: str,
+) -> TransactionPayload:
+    """构建 create_task 交易Payload"""
+    payload = EntryFunction.natural(
+        get_module_id(creator_addr),
+        "create_task",
+        [], # 无 type arguments
+        [
+            TransactionArgument(format_task_id(task_id), U8_SEQUENCE_SERIALIZER),
+            TransactionArgument(parse_address(service_agent), Serializer.struct),
+            TransactionArgument(amount_octas, Serializer.u64),
+            TransactionArgument(deadline_secs, Serializer.u64),
+            TransactionArgument(description, Serializer.str),
+        ],
+    )
+    return TransactionPayload(payload)
 
 async def create_task(
     profile: str,
@@ -17,10 +57,13 @@ async def create_task(
     amount_octas: int,
     deadline_secs: int,
     description: str,
+    client: Optional[RestClient] = None,
 ):
-    """构建并提交一个 create_task 交易"""
+    """构建并提交一个 create_task 交易（传入 client 时复用调用方的客户端，不在此关闭）"""
     
-    client, task_agent_account = await get_client_and_account(profile)
+    # 未传入 client 时新建客户端，并在结束时关闭；传入的客户端由调用方负责关闭
+    owns_client = client is None
+    client, task_agent_account = await get_client_and_account(profile, client)
     
     print("正在创建任务...")
     print(f"  - Profile: {profile}")
@@ -31,57 +74,165 @@ async def create_task(
     print(f"  - 截止时间: {deadline_secs} 秒")
     print(f"  - 描述: '{description}'")
 
-    # 将 task_id 字符串转换为字节数组
-    task_id_bytes = task_id.encode('utf-8')
-
     # 1. 构建交易Payload
-    payload = EntryFunction.natural(
-        f"{task_agent_account.address()}::task_manager",
-        "create_task",
-        [], # 无 type arguments
-        [
-            TransactionArgument(task_id_bytes, Serializer.sequence_serializer(Serializer.u8)),
-            TransactionArgument(AccountAddress.from_str(service_agent), Serializer.struct),
-            TransactionArgument(amount_octas, Serializer.u64),
-            TransactionArgument(deadline_secs, Serializer.u64),
-            TransactionArgument(description, Serializer.str),
-        ],
+    payload = build_create_task_payload(
+        str(task_agent_account.address()), task_id, service_agent, amount_octas, deadline_secs, description
     )
     
     # 2. 生成并签名交易
+    # 序列号和链 ID 同时查询，签名时不再依次请求节点
+    sequence_number = await prime_account_context(client, task_agent_account)
     signed_transaction = await client.create_bcs_signed_transaction(
-        task_agent_account, TransactionPayload(payload)
+        task_agent_account, payload, sequence_number=sequence_number
     )
     
     # 3. 提交交易
     try:
         txn_hash = await client.submit_bcs_transaction(signed_transaction)
         print(f"交易提交中... 哈希: {txn_hash}")
-        await client.wait_for_transaction(txn_hash)
-        
-        # 为了获取版本号，我们需要在等待后再次查询交易
-        tx_info = await client.transaction_by_hash(txn_hash)
+        tx_info = await wait_for_transaction_info(client, txn_hash)
         print(f"交易成功! 版本: {tx_info['version']}")
     except Exception as e:
         print(f"交易失败: {e}")
     finally:
-        await client.close()
+        if owns_client:
+            await client.close()
+
+async def create_tasks(
+    profile: str,
+    tasks: List[Tuple[str, str, int, int, str]],
+    client: Optional[RestClient] = None,
+    verbose: bool = False,
+) -> List[bool]:
+    """
+    批量创建任务，tasks 为 (任务ID, 服务提供者地址, 支付金额, 截止秒数, 描述) 列表。
+    
+    先用连续序列号签名并提交全部交易，再统一等待确认，
+    而不是循环调用 create_task 逐笔提交、逐笔等待。
+    每个任务的结果在全部确认后一次性输出：失败的任务总是输出，
+    成功的任务只在 verbose 为 True 时输出，最后输出成功数量。
+    """
+    
+    # 未传入 client 时新建客户端，并在结束时关闭；传入的客户端由调用方负责关闭
+    owns_client = client is None
+    client, task_agent_account = await get_client_and_account(profile, client)
+    creator_addr = str(task_agent_account.address())
+    
+    print(f"正在批量创建 {len(tasks)} 个任务...")
+    print(f"  - Profile: {profile}")
+    print(f"  - 任务创建者: {creator_addr}")
+    
+    try:
+        payloads = [build_create_task_payload(creator_addr, *task) for task in tasks]
+        # 某笔提交失败时其他交易的哈希照常返回，已提交的交易仍会上链，按任务分别报告结果
+        txn_hashes = await submit_transactions(client, task_agent_account, payloads)
+        tx_infos = await wait_for_transactions(client, txn_hashes)
+    except Exception as e:
+        print(f"交易失败: {e}")
+        return [False] * len(tasks)
+    finally:
+        if owns_client:
+            await client.close()
+    
+    results = []
+    lines = []
+    for (task_id, *_), txn_hash, tx_info in zip(tasks, txn_hashes, tx_infos):
+        if isinstance(txn_hash, Exception):
+            lines.append(f"任务 {task_id} 提交失败: {txn_hash}")
+            results.append(False)
+        elif isinstance(tx_info, Exception):
+            lines.append(f"任务 {task_id} 创建失败: {tx_info} 哈希: {txn_hash}")
+            results.append(False)
+        else:
+            if verbose:
+                lines.append(f"任务 {task_id} 创建成功! 哈希: {txn_hash} 版本: {tx_info['version']}")
+            results.append(True)
+    
+    if lines:
+        print("\n".join(lines))
+    print(f"批量创建完成: {sum(results)}/{len(tasks)} 个任务成功")
+    return results
+
+def read_tasks_file(path: str) -> List[Tuple[str, str, int, int, str]]:
+    """
+    读取 JSONL 任务文件，每行:
+    {"task_id": ..., "service_agent": ..., "amount_octas": ..., "deadline_secs": ..., "description": ...}
+    
+    格式错误时抛出 ValueError 并指出行号，文件中没有任务时同样抛出 ValueError。
+    """
+    tasks = []
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                task = json.loads(line)
+                tasks.append((
+                    str(task["task_id"]),
+                    str(task["service_agent"]),
+                    int(task["amount_octas"]),
+                    int(task["deadline_secs"]),
+                    str(task["description"]),
+                ))
+            except KeyError as e:
+                raise ValueError(f"任务文件第 {line_number} 行缺少字段 {e}")
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"任务文件第 {line_number} 行格式错误: {e}")
+    
+    if not tasks:
+        raise ValueError(f"任务文件 {path} 中没有任务")
+    return tasks
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="创建一个新的Aptos任务")
-    parser.add_argument("task_id", type=str, help="任务的唯一ID (字符串)")
-    parser.add_argument("service_agent", type=str, help="服务提供者的地址")
-    parser.add_argument("amount_octas", type=int, help="支付金额 (Octas)")
-    parser.add_argument("deadline_secs", type=int, help="任务截止秒数")
-    parser.add_argument("description", type=str, help="任务描述")
+    parser.add_argument("task_id", type=str, nargs="?", help="任务的唯一ID (字符串)")
+    parser.add_argument("service_agent", type=str, nargs="?", help="服务提供者的地址")
+    parser.add_argument("amount_octas", type=int, nargs="?", help="支付金额 (Octas)")
+    parser.add_argument("deadline_secs", type=int, nargs="?", help="任务截止秒数")
+    parser.add_argument("description", type=str, nargs="?", help="任务描述")
     parser.add_argument(
         "--profile",
         default=DEFAULT_PROFILE,
         help=f"指定用于签名的Aptos CLI profile (默认: {DEFAULT_PROFILE})",
     )
+    parser.add_argument(
+        "--tasks-file",
+        help="从 JSONL 文件读取多个任务，连续提交后统一等待确认 (此时忽略位置参数)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="使用 --tasks-file 时逐个输出成功创建的任务 (失败的任务总是输出)",
+    )
+    
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="只在本地构建并签名交易，输出大小和哈希，不连接节点也不提交",
+    )
     
     args = parser.parse_args()
     
+    if args.tasks_file:
+        try:
+            tasks = read_tasks_file(args.tasks_file)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    elif args.description is None:
+        parser.error("请指定任务参数或 --tasks-file")
+    else:
+        tasks = [(args.task_id, args.service_agent, args.amount_octas, args.deadline_secs, args.description)]
+    
+    if args.dry_run:
+        account = load_account_from_profile(args.profile)
+        for task in tasks:
+            dry_run_transaction(account, build_create_task_payload(str(account.address()), *task))
+        sys.exit(0)
+    
+    install_uvloop()
+    if args.tasks_file:
+        results = asyncio.run(create_tasks(args.profile, tasks, verbose=args.verbose))
+        sys.exit(0 if all(results) else 1)
     asyncio.run(
         create_task(
             args.profile,
@@ -45,6 +45,7 @@ module aptos_task_manager::bidding_system {
     const EALREADY_BIDDED: u64 = 110;
     const EBIDDING_PERIOD_EXPIRED: u64 = 111;
     const EINVALID_WINNER_SELECTION: u64 = 112;
+    const EBATCH_LENGTH_MISMATCH: u64 = 113;
 
     // Core Data Structures
 
@@ -214,6 +215,36 @@ module aptos_task_manager::bidding_system {
         });
     }
 
+    /// Personal Agent publishes several tasks in one transaction
+    /// 
+    /// The batch is atomic: if any single task fails validation, none of the tasks are published.
+    public entry fun publish_tasks_batch(
+        creator: &signer,
+        platform_addr: address,
+        task_ids: vector<vector<u8>>,
+        descriptions: vector<String>,
+        max_budgets: vector<u64>,
+        deadline_seconds: vector<u64>,
+    ) acquires BiddingPlatform {
+        let batch_size = vector::length(&task_ids);
+        assert!(vector::length(&descriptions) == batch_size, EBATCH_LENGTH_MISMATCH);
+        assert!(vector::length(&max_budgets) == batch_size, EBATCH_LENGTH_MISMATCH);
+        assert!(vector::length(&deadline_seconds) == batch_size, EBATCH_LENGTH_MISMATCH);
+        
+        let i = 0;
+        while (i < batch_size) {
+            publish_task(
+                creator,
+                platform_addr,
+                *vector::borrow(&task_ids, i),
+                *vector::borrow(&descriptions, i),
+                *vector::borrow(&max_budgets, i),
+                *vector::borrow(&deadline_seconds, i),
+            );
+            i = i + 1;
+        };
+    }
+
     /// Service Agent places a bid on a published task
     public entry fun place_bid(
         bidder: &signer,
@@ -265,6 +296,33 @@ module aptos_task_manager::bidding_system {
         });
     }
 
+    /// Service Agent places bids on several published tasks in one transaction
+    /// 
+    /// The batch is atomic: if any single bid fails, none of the bids are placed.
+    public entry fun place_bids_batch(
+        bidder: &signer,
+        platform_addr: address,
+        task_ids: vector<vector<u8>>,
+        bid_prices: vector<u64>,
+        reputation_scores: vector<u64>,
+    ) acquires BiddingPlatform {
+        let batch_size = vector::length(&task_ids);
+        assert!(vector::length(&bid_prices) == batch_size, EBATCH_LENGTH_MISMATCH);
+        assert!(vector::length(&reputation_scores) == batch_size, EBATCH_LENGTH_MISMATCH);
+        
+        let i = 0;
+        while (i < batch_size) {
+            place_bid(
+                bidder,
+                platform_addr,
+                *vector::borrow(&task_ids, i),
+                *vector::borrow(&bid_prices, i),
+                *vector::borrow(&reputation_scores, i),
+            );
+            i = i + 1;
+        };
+    }
+
     /// Executor selects winner based on price and reputation
     public entry fun select_winner(
         executor: &signer,
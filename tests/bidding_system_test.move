@@ -139,6 +139,46 @@ module aptos_task_manager::bidding_system_test {
         // The fact that we got 2 bids confirms they were placed correctly
     }
 
+    #[test]
+    fun test_batch_bid_placement() {
+        let (platform, creator, bidder1, _bidder2) = setup_test_environment();
+        
+        // Initialize platform
+        bidding_system::initialize(&platform);
+        
+        // Publish two tasks
+        bidding_system::publish_task(
+            &creator,
+            PLATFORM_ADDR,
+            TASK_ID,
+            string::utf8(b"Test task description"),
+            MAX_BUDGET,
+            DEADLINE_SECONDS,
+        );
+        
+        bidding_system::publish_task(
+            &creator,
+            PLATFORM_ADDR,
+            b"test_task_002",
+            string::utf8(b"Second task description"),
+            MAX_BUDGET,
+            DEADLINE_SECONDS,
+        );
+        
+        // Bid on both tasks in one call
+        bidding_system::place_bids_batch(
+            &bidder1,
+            PLATFORM_ADDR,
+            vector[TASK_ID, b"test_task_002"],
+            vector[BID_PRICE_1, BID_PRICE_2],
+            vector[REPUTATION_SCORE, REPUTATION_SCORE],
+        );
+        
+        // Verify one bid was placed on each task
+        assert!(bidding_system::get_task_bid_count(PLATFORM_ADDR, TASK_ID) == 1, 1);
+        assert!(bidding_system::get_task_bid_count(PLATFORM_ADDR, b"test_task_002") == 1, 2);
+    }
+
     #[test]
     fun test_winner_selection() {
         let (platform, creator, bidder1, bidder2) = setup_test_environment();
@@ -371,6 +411,76 @@ module aptos_task_manager::bidding_system_test {
         );
     }
 
+    #[test]
+    #[expected_failure(abort_code = 113)] // EBATCH_LENGTH_MISMATCH
+    fun test_batch_bid_length_mismatch_failure() {
+        let (platform, creator, bidder1, _bidder2) = setup_test_environment();
+        
+        // Initialize platform
+        bidding_system::initialize(&platform);
+        
+        // Publish task
+        bidding_system::publish_task(
+            &creator,
+            PLATFORM_ADDR,
+            TASK_ID,
+            string::utf8(b"Test task description"),
+            MAX_BUDGET,
+            DEADLINE_SECONDS,
+        );
+        
+        // Try to batch bid with more prices than task IDs (should fail)
+        bidding_system::place_bids_batch(
+            &bidder1,
+            PLATFORM_ADDR,
+            vector[TASK_ID],
+            vector[BID_PRICE_1, BID_PRICE_2],
+            vector[REPUTATION_SCORE],
+        );
+    }
+
+    #[test]
+    fun test_batch_task_publishing() {
+        let (platform, creator, _bidder1, _bidder2) = setup_test_environment();
+        
+        // Initialize platform
+        bidding_system::initialize(&platform);
+        
+        // Publish two tasks in one call
+        bidding_system::publish_tasks_batch(
+            &creator,
+            PLATFORM_ADDR,
+            vector[TASK_ID, b"test_task_002"],
+            vector[string::utf8(b"Test task description"), string::utf8(b"Second task description")],
+            vector[MAX_BUDGET, MAX_BUDGET],
+            vector[DEADLINE_SECONDS, DEADLINE_SECONDS],
+        );
+        
+        // Verify both tasks were published and both budgets escrowed
+        let (total_tasks, _completed_tasks, _cancelled_tasks) = bidding_system::get_platform_stats(PLATFORM_ADDR);
+        assert!(total_tasks == 2, 1);
+        assert!(coin::balance<AptosCoin>(CREATOR_ADDR) == 0, 2);
+    }
+
+    #[test]
+    #[expected_failure(abort_code = 113)] // EBATCH_LENGTH_MISMATCH
+    fun test_batch_publish_length_mismatch_failure() {
+        let (platform, creator, _bidder1, _bidder2) = setup_test_environment();
+        
+        // Initialize platform
+        bidding_system::initialize(&platform);
+        
+        // Try to batch publish with fewer budgets than task IDs (should fail)
+        bidding_system::publish_tasks_batch(
+            &creator,
+            PLATFORM_ADDR,
+            vector[TASK_ID, b"test_task_002"],
+            vector[string::utf8(b"Test task description"), string::utf8(b"Second task description")],
+            vector[MAX_BUDGET],
+            vector[DEADLINE_SECONDS, DEADLINE_SECONDS],
+        );
+    }
+
     #[test]
     #[expected_failure(abort_code = 109)] // ENO_BIDS_PLACED
     fun test_select_winner_no_bids_failure() {